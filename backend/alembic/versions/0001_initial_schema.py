@@ -0,0 +1,188 @@
+"""initial schema
+
+Schema as created by Base.metadata.create_all before migrations existed.
+Databases bootstrapped that way should be stamped: alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 08:28:13.081759
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import app.core.database
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('condominios',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('nome', sa.String(length=255), nullable=False),
+    sa.Column('cnpj', sa.String(length=14), nullable=False),
+    sa.Column('endereco', sa.String(length=500), nullable=False),
+    sa.Column('cidade', sa.String(length=100), nullable=False),
+    sa.Column('estado', sa.String(length=2), nullable=False),
+    sa.Column('cep', sa.String(length=8), nullable=False),
+    sa.Column('total_unidades', sa.Integer(), nullable=False),
+    sa.Column('total_blocos', sa.Integer(), nullable=True),
+    sa.Column('telefone', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cnpj')
+    )
+    op.create_table('moradores',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('nome_completo', sa.String(length=255), nullable=False),
+    sa.Column('cpf', sa.String(length=11), nullable=False),
+    sa.Column('rg', sa.String(length=20), nullable=True),
+    sa.Column('data_nascimento', sa.Date(), nullable=True),
+    sa.Column('telefone', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('foto_perfil_url', sa.String(length=500), nullable=True),
+    sa.Column('fotos_reconhecimento', sa.Text(), nullable=True),
+    sa.Column('facial_encoding', sa.Text(), nullable=True),
+    sa.Column('qr_code_permanente', sa.String(length=100), nullable=True),
+    sa.Column('pin_acesso', sa.String(length=6), nullable=True),
+    sa.Column('rfid_card', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_inadimplente', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('qr_code_permanente'),
+    sa.UniqueConstraint('rfid_card')
+    )
+    with op.batch_alter_table('moradores', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_moradores_cpf'), ['cpf'], unique=True)
+
+    op.create_table('usuarios',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('nome', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Enum('ADMIN', 'PORTEIRO', 'MORADOR', 'SINDICO', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('mfa_enabled', sa.Boolean(), nullable=True),
+    sa.Column('mfa_secret', sa.String(length=32), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_usuarios_email'), ['email'], unique=True)
+
+    op.create_table('visitantes',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('nome_completo', sa.String(length=255), nullable=False),
+    sa.Column('tipo_documento', sa.Enum('CPF', 'RG', 'CNH', 'PASSAPORTE', 'RNE', name='tipodocumento'), nullable=False),
+    sa.Column('numero_documento', sa.String(length=20), nullable=False),
+    sa.Column('telefone', sa.String(length=20), nullable=True),
+    sa.Column('foto_url', sa.String(length=500), nullable=True),
+    sa.Column('facial_encoding', sa.Text(), nullable=True),
+    sa.Column('is_blacklisted', sa.Boolean(), nullable=True),
+    sa.Column('blacklist_reason', sa.Text(), nullable=True),
+    sa.Column('blacklisted_at', sa.DateTime(), nullable=True),
+    sa.Column('primeira_visita', sa.DateTime(), nullable=True),
+    sa.Column('total_visitas', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('visitantes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_visitantes_numero_documento'), ['numero_documento'], unique=False)
+
+    op.create_table('unidades',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('condominio_id', app.core.database.GUID(), nullable=False),
+    sa.Column('numero', sa.String(length=10), nullable=False),
+    sa.Column('bloco', sa.String(length=10), nullable=True),
+    sa.Column('andar', sa.Integer(), nullable=True),
+    sa.Column('area_m2', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['condominio_id'], ['condominios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('correspondencias',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('unidade_id', app.core.database.GUID(), nullable=False),
+    sa.Column('destinatario', sa.String(length=255), nullable=False),
+    sa.Column('tipo', sa.Enum('CARTA', 'ENVELOPE', 'CAIXA_PEQUENA', 'CAIXA_MEDIA', 'CAIXA_GRANDE', 'SEDEX', 'TELEGRAMA', 'NOTIFICACAO', name='tipocorrespondencia'), nullable=False),
+    sa.Column('remetente', sa.String(length=255), nullable=True),
+    sa.Column('descricao', sa.Text(), nullable=True),
+    sa.Column('codigo_rastreio', sa.String(length=100), nullable=True),
+    sa.Column('recebido_por', sa.String(length=255), nullable=False),
+    sa.Column('data_recebimento', sa.DateTime(), nullable=False),
+    sa.Column('foto_url', sa.String(length=500), nullable=True),
+    sa.Column('status', sa.Enum('AGUARDANDO_RETIRADA', 'ENTREGUE', 'DEVOLVIDA', 'NAO_RETIRADA', name='statuscorrespondencia'), nullable=True),
+    sa.Column('entregue_para', sa.String(length=255), nullable=True),
+    sa.Column('assinatura_base64', sa.Text(), nullable=True),
+    sa.Column('data_entrega', sa.DateTime(), nullable=True),
+    sa.Column('entregue_por', sa.String(length=255), nullable=True),
+    sa.Column('morador_notificado', sa.Boolean(), nullable=True),
+    sa.Column('data_notificacao', sa.DateTime(), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['unidade_id'], ['unidades.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('visitas',
+    sa.Column('id', app.core.database.GUID(), nullable=False),
+    sa.Column('visitante_id', app.core.database.GUID(), nullable=False),
+    sa.Column('unidade_id', app.core.database.GUID(), nullable=False),
+    sa.Column('autorizado_por', app.core.database.GUID(), nullable=True),
+    sa.Column('registrado_por', app.core.database.GUID(), nullable=True),
+    sa.Column('tipo', sa.Enum('COMUM', 'RECORRENTE', 'DELIVERY', 'PRESTADOR', name='tipovisita'), nullable=False),
+    sa.Column('status', sa.Enum('PENDENTE', 'AUTORIZADA', 'NEGADA', 'DENTRO', 'FINALIZADA', 'CANCELADA', name='statusvisita'), nullable=False),
+    sa.Column('qr_code', sa.String(length=500), nullable=True),
+    sa.Column('qr_nonce', sa.String(length=50), nullable=True),
+    sa.Column('qr_signature', sa.String(length=64), nullable=True),
+    sa.Column('data_prevista', sa.DateTime(), nullable=True),
+    sa.Column('valido_ate', sa.DateTime(), nullable=True),
+    sa.Column('data_entrada', sa.DateTime(), nullable=True),
+    sa.Column('data_saida', sa.DateTime(), nullable=True),
+    sa.Column('duracao_minutos', sa.Integer(), nullable=True),
+    sa.Column('autorizado_em', sa.DateTime(), nullable=True),
+    sa.Column('metodo_autorizacao', sa.String(length=50), nullable=True),
+    sa.Column('motivo', sa.String(length=255), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['autorizado_por'], ['moradores.id'], ),
+    sa.ForeignKeyConstraint(['registrado_por'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['unidade_id'], ['unidades.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['visitante_id'], ['visitantes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('qr_code')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('visitas')
+    op.drop_table('correspondencias')
+    op.drop_table('unidades')
+    with op.batch_alter_table('visitantes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_visitantes_numero_documento'))
+
+    op.drop_table('visitantes')
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_usuarios_email'))
+
+    op.drop_table('usuarios')
+    with op.batch_alter_table('moradores', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_moradores_cpf'))
+
+    op.drop_table('moradores')
+    op.drop_table('condominios')
@@ -0,0 +1,51 @@
+"""hot path indexes
+
+Indexes for the filter/lookup columns used by the gate and dashboard:
+visit status/entry, scheduled date, QR nonce lookup, list ordering and
+mail status/unit. Skips indexes that already exist, so databases created
+by create_all after this change can be stamped at 0001 and upgraded.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 08:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_visitas_status_data_entrada', 'visitas', ['status', 'data_entrada']),
+    ('ix_visitas_qr_nonce_signature', 'visitas', ['qr_nonce', 'qr_signature']),
+    ('ix_visitas_data_prevista', 'visitas', ['data_prevista']),
+    ('ix_visitas_created_at', 'visitas', ['created_at']),
+    ('ix_correspondencias_status_data_recebimento', 'correspondencias', ['status', 'data_recebimento']),
+    ('ix_correspondencias_unidade_id_status', 'correspondencias', ['unidade_id', 'status']),
+    ('ix_correspondencias_data_recebimento', 'correspondencias', ['data_recebimento']),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    existing = {table: _existing_indexes(table) for table in {t for _, t, _ in INDEXES}}
+    for name, table, columns in INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,56 @@
+"""keyset pagination indexes
+
+Composite (sort column, id) indexes so cursor pagination can seek and
+order entirely from the index. They supersede the single-column
+created_at / data_recebimento indexes from 0002.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_visitas_created_at_id', 'visitas', ['created_at', 'id']),
+    ('ix_correspondencias_data_recebimento_id', 'correspondencias', ['data_recebimento', 'id']),
+    ('ix_moradores_created_at_id', 'moradores', ['created_at', 'id']),
+    ('ix_visitantes_created_at_id', 'visitantes', ['created_at', 'id']),
+]
+
+SUPERSEDED = [
+    ('ix_visitas_created_at', 'visitas', ['created_at']),
+    ('ix_correspondencias_data_recebimento', 'correspondencias', ['data_recebimento']),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=False)
+    for name, table, _ in SUPERSEDED:
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, columns in SUPERSEDED:
+        op.create_index(name, table, columns, unique=False)
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
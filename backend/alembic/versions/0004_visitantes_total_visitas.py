@@ -0,0 +1,43 @@
+"""visitantes total_visitas
+
+Index for ranking visitors by total_visitas and a backfill of the counter,
+which was never maintained before: one grouped count of entered visits.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = ('ix_visitantes_total_visitas_id', 'visitantes', ['total_visitas', 'id'])
+
+
+def upgrade() -> None:
+    name, table, columns = INDEX
+    inspector = sa.inspect(op.get_bind())
+    if name not in {index['name'] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, unique=False)
+
+    op.execute(
+        "UPDATE visitantes SET total_visitas = COALESCE(("
+        "SELECT COUNT(*) FROM visitas "
+        "WHERE visitas.visitante_id = visitantes.id AND visitas.data_entrada IS NOT NULL"
+        "), 0)"
+    )
+
+
+def downgrade() -> None:
+    name, table, _ = INDEX
+    op.drop_index(name, table_name=table)
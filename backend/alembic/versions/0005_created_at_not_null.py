@@ -0,0 +1,42 @@
+"""created_at not null on paginated tables
+
+Keyset pagination orders visitas, visitantes and moradores by
+(created_at, id). A NULL created_at cannot be encoded in a cursor and is
+skipped by the seek condition, so backfill it (from updated_at, else the
+migration time) and make the column NOT NULL.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:35:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['visitas', 'visitantes', 'moradores']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"UPDATE {table} SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+            "WHERE created_at IS NULL"
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,38 @@
+"""visitas replica index
+
+Every gate node polls GET /gates/replica with updated_at >= since AND
+valido_ate > now; without an index each poll scanned all of visitas.
+Leading on updated_at, so an incremental pull seeks to the recent rows
+and filters valido_ate from the index.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 09:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = ('ix_visitas_updated_at_valido_ate', 'visitas', ['updated_at', 'valido_ate'])
+
+
+def upgrade() -> None:
+    name, table, columns = INDEX
+    inspector = sa.inspect(op.get_bind())
+    if name not in {index['name'] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    name, table, _ = INDEX
+    op.drop_index(name, table_name=table)
@@ -1,6 +1,6 @@
 """API v1 routes"""
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, moradores, visitantes, visitas, correspondencias, dashboard
+from app.api.v1.endpoints import auth, moradores, visitantes, visitas, correspondencias, dashboard, gates, admin
 
 api_router = APIRouter()
 
@@ -10,3 +10,5 @@ api_router.include_router(moradores.router, prefix="/moradores", tags=["Moradore
 api_router.include_router(visitantes.router, prefix="/visitantes", tags=["Visitantes"])
 api_router.include_router(visitas.router, prefix="/visitas", tags=["Visitas"])
 api_router.include_router(correspondencias.router, prefix="/correspondencias", tags=["Correspondências"])
+api_router.include_router(gates.router, prefix="/gates", tags=["Portarias"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
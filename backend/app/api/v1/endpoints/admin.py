@@ -0,0 +1,49 @@
+"""Admin-only operational endpoints"""
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.api.v1.endpoints.auth import require_admin
+from app.core.config import settings
+from app.core.profiler import SUPPORTED, ProfilerBusy, ProfilerUnavailable, profiler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    format: Literal["json", "collapsed"] = "json"
+):
+    """
+    Profile this worker for `seconds` while it keeps serving requests.
+    json: CPU time per route + collapsed stacks; collapsed: only the stacks
+    (text/plain, ready for flamegraph.pl or speedscope)
+    """
+    if not SUPPORTED:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Profiler indisponível nesta plataforma"
+        )
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Duração máxima: {settings.PROFILER_MAX_SECONDS}s"
+        )
+    try:
+        profiler.start(interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ProfilerUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        result = profiler.stop()
+
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"] + "\n")
+    return result
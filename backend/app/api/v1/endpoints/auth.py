@@ -1,20 +1,30 @@
 """Authentication endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from uuid import UUID
+import logging
+import time
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.config import settings
+from app.core.principals import Principal, load_principal
+from app.core.refresh_tokens import revocation_store, RevocationStoreUnavailable
+from app.core.write_behind import write_behind
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
-    decode_token
+    decode_token,
+    token_cache
 )
-from app.models.user import User
+from app.models.user import User, UserRole
 from pydantic import BaseModel, EmailStr
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -24,7 +34,7 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
     nome: str
-    role: str = "morador"
+    # No role: self-registration is always morador (a "role" in the body is ignored)
 
 
 class Token(BaseModel):
@@ -33,8 +43,12 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class UserResponse(BaseModel):
-    id: str
+    id: UUID
     email: str
     nome: str
     role: str
@@ -44,11 +58,51 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+async def current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Dependency for authenticated endpoints: the active user behind the
+    bearer access token. Verified tokens and loaded users are cached, so a
+    repeat request usually skips both the JWT decode and the query.
+    """
+    payload = token_cache.claims(token)
+    principal = None
+    if payload and payload.get("type") == "access":
+        try:
+            principal = await load_principal(db, UUID(payload.get("sub")))
+        except (TypeError, ValueError):
+            principal = None
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+    return principal
+
+
+async def require_admin(user: Principal = Depends(current_user)) -> Principal:
+    """Dependency for admin-only endpoints (current role, not the token's)"""
+    if user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register new user"""
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,14 +112,14 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     new_user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         nome=user_data.nome,
-        role=user_data.role
+        role=UserRole.MORADOR
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
@@ -73,13 +127,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login and get access token"""
     # Find user
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -92,9 +146,8 @@ async def login(
             detail="User account is inactive"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Non-critical: written by the next write-behind flush, not a commit per login
+    write_behind.put(User.last_login, user.id, datetime.utcnow(), mode="max")
     
     # Create tokens
     access_token = create_access_token(data={"sub": str(user.id), "role": user.role})
@@ -108,27 +161,76 @@ async def login(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+async def get_current_user(user: Principal = Depends(current_user)):
     """Get current authenticated user"""
-    payload = decode_token(token)
-    
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     return user
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Session store unavailable, try again",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _family_lifetime() -> float:
+    """Until when a revoked session could still hold an unexpired refresh token"""
+    return time.time() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS).total_seconds()
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access + refresh token pair.
+    Costs one signature check (no bcrypt). Each refresh token works once;
+    reusing one revokes its whole session.
+    """
+    payload = decode_token(data.refresh_token)
+    if not payload or payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        raise _invalid_refresh_token()
+    family = payload["fam"]
+
+    try:
+        if await revocation_store.is_revoked(family):
+            raise _invalid_refresh_token()
+        if not await revocation_store.consume(payload["jti"], payload["exp"]):
+            logger.warning(f"⚠️ Refresh token reutilizado (usuário {payload.get('sub')}): sessão revogada")
+            await revocation_store.revoke_family(family, _family_lifetime())
+            raise _invalid_refresh_token()
+
+        try:
+            user = await load_principal(db, UUID(payload.get("sub")))
+        except (TypeError, ValueError):
+            user = None
+        if user is None or not user.is_active:
+            await revocation_store.revoke_family(family, _family_lifetime())
+            raise _invalid_refresh_token()
+    except RevocationStoreUnavailable:
+        raise _store_unavailable()
+
+    return {
+        "access_token": create_access_token(data={"sub": str(user.id), "role": user.role}),
+        "refresh_token": create_refresh_token(data={"sub": str(user.id)}, family=family),
+        "token_type": "bearer"
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshRequest):
+    """Revoke the session of a refresh token (every token rotated from the same login)"""
+    payload = decode_token(data.refresh_token)
+    if not payload or payload.get("type") != "refresh" or not payload.get("fam"):
+        raise _invalid_refresh_token()
+    try:
+        await revocation_store.revoke_family(payload["fam"], _family_lifetime())
+    except RevocationStoreUnavailable:
+        raise _store_unavailable()
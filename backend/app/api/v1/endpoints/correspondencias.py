@@ -1,12 +1,14 @@
 """Correspondências (mail/packages) endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
 from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import paginate, page_items, NEXT_CURSOR_HEADER
 from app.models.correspondencia import Correspondencia, TipoCorrespondencia, StatusCorrespondencia
 
 router = APIRouter()
@@ -57,27 +59,40 @@ class CorrespondenciaResponse(BaseModel):
 
 @router.get("", response_model=List[CorrespondenciaResponse])
 async def list_correspondencias(
+    response: Response,
     status_filter: str | None = None,
     unidade_id: str | None = None,
-    skip: int = 0,
+    cursor: str | None = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    skip: int | None = Query(None, deprecated=True, description="Legado: use cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List mail/packages with optional filters (default limit: 50)"""
-    query = db.query(Correspondencia)
+    """
+    List mail/packages with optional filters (default limit: 50)
+    Newest first; pass the X-Next-Cursor response header back as cursor
+    """
+    query = select(Correspondencia)
     
     if status_filter:
-        query = query.filter(Correspondencia.status == status_filter)
+        query = query.where(Correspondencia.status == status_filter)
     
     if unidade_id:
-        query = query.filter(Correspondencia.unidade_id == unidade_id)
+        query = query.where(Correspondencia.unidade_id == unidade_id)
     
-    correspondencias = query.order_by(Correspondencia.data_recebimento.desc()).offset(skip).limit(limit).all()
+    rows = (await db.scalars(
+        paginate(
+            query, Correspondencia.data_recebimento, Correspondencia.id,
+            limit=limit, cursor=cursor, skip=skip
+        )
+    )).all()
+    correspondencias, next_cursor = page_items(rows, limit, "data_recebimento")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return correspondencias
 
 
 @router.post("", response_model=CorrespondenciaResponse, status_code=status.HTTP_201_CREATED)
-async def create_correspondencia(data: CorrespondenciaCreate, db: Session = Depends(get_db)):
+async def create_correspondencia(data: CorrespondenciaCreate, db: AsyncSession = Depends(get_async_db)):
     """Register new mail/package received"""
     correspondencia = Correspondencia(
         unidade_id=data.unidade_id,
@@ -92,16 +107,18 @@ async def create_correspondencia(data: CorrespondenciaCreate, db: Session = Depe
     )
     
     db.add(correspondencia)
-    db.commit()
-    db.refresh(correspondencia)
+    await db.commit()
+    await db.refresh(correspondencia)
     
     return correspondencia
 
 
 @router.get("/{correspondencia_id}", response_model=CorrespondenciaResponse)
-async def get_correspondencia(correspondencia_id: UUID, db: Session = Depends(get_db)):
+async def get_correspondencia(correspondencia_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get mail/package by ID"""
-    correspondencia = db.query(Correspondencia).filter(Correspondencia.id == correspondencia_id).first()
+    correspondencia = await db.scalar(
+        select(Correspondencia).where(Correspondencia.id == correspondencia_id)
+    )
     
     if not correspondencia:
         raise HTTPException(
@@ -116,10 +133,12 @@ async def get_correspondencia(correspondencia_id: UUID, db: Session = Depends(ge
 async def entregar_correspondencia(
     correspondencia_id: UUID,
     data: CorrespondenciaEntrega,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register delivery with signature"""
-    correspondencia = db.query(Correspondencia).filter(Correspondencia.id == correspondencia_id).first()
+    correspondencia = await db.scalar(
+        select(Correspondencia).where(Correspondencia.id == correspondencia_id)
+    )
     
     if not correspondencia:
         raise HTTPException(
@@ -143,43 +162,47 @@ async def entregar_correspondencia(
     if data.observacoes:
         correspondencia.observacoes = (correspondencia.observacoes or "") + f"\nEntrega: {data.observacoes}"
     
-    db.commit()
-    db.refresh(correspondencia)
+    await db.commit()
+    await db.refresh(correspondencia)
     
     return correspondencia
 
 
 @router.get("/aguardando/count")
-async def count_aguardando(db: Session = Depends(get_db)):
+async def count_aguardando(db: AsyncSession = Depends(get_async_db)):
     """Count pending deliveries"""
-    count = db.query(Correspondencia).filter(
-        Correspondencia.status == StatusCorrespondencia.AGUARDANDO_RETIRADA
-    ).count()
+    count = await db.scalar(
+        select(func.count(Correspondencia.id)).where(
+            Correspondencia.status == StatusCorrespondencia.AGUARDANDO_RETIRADA
+        )
+    )
     
     return {"count": count}
 
 
 @router.get("/aguardando/por-unidade")
-async def aguardando_por_unidade(db: Session = Depends(get_db)):
+async def aguardando_por_unidade(db: AsyncSession = Depends(get_async_db)):
     """List pending deliveries grouped by unit"""
-    from sqlalchemy import func
-    
-    result = db.query(
-        Correspondencia.unidade_id,
-        func.count(Correspondencia.id).label('total')
-    ).filter(
-        Correspondencia.status == StatusCorrespondencia.AGUARDANDO_RETIRADA
-    ).group_by(
-        Correspondencia.unidade_id
-    ).all()
+    result = (await db.execute(
+        select(
+            Correspondencia.unidade_id,
+            func.count(Correspondencia.id).label('total')
+        ).where(
+            Correspondencia.status == StatusCorrespondencia.AGUARDANDO_RETIRADA
+        ).group_by(
+            Correspondencia.unidade_id
+        )
+    )).all()
     
     return [{"unidade_id": str(r[0]), "total": r[1]} for r in result]
 
 
 @router.delete("/{correspondencia_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_correspondencia(correspondencia_id: UUID, db: Session = Depends(get_db)):
+async def delete_correspondencia(correspondencia_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Delete mail/package record"""
-    correspondencia = db.query(Correspondencia).filter(Correspondencia.id == correspondencia_id).first()
+    correspondencia = await db.scalar(
+        select(Correspondencia).where(Correspondencia.id == correspondencia_id)
+    )
     
     if not correspondencia:
         raise HTTPException(
@@ -187,7 +210,7 @@ async def delete_correspondencia(correspondencia_id: UUID, db: Session = Depends
             detail="Correspondência not found"
         )
     
-    db.delete(correspondencia)
-    db.commit()
+    await db.delete(correspondencia)
+    await db.commit()
     
     return None
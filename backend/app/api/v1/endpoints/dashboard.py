@@ -1,18 +1,54 @@
 """Dashboard statistics endpoint - optimized for performance"""
 from fastapi import APIRouter, Depends
+from sqlalchemy import select, func, event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from itertools import chain
 
-from app.core.database import get_db
+from app.core.cache import AsyncTTLCache
+from app.core.config import settings
+from app.core.database import get_async_db
 from app.models.morador import Morador
 from app.models.visitante import Visitante
-from app.models.visita import Visita
+from app.models.visita import Visita, StatusVisita
 from app.models.correspondencia import Correspondencia, StatusCorrespondencia
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Shared by every porter screen polling /stats
+stats_cache = AsyncTTLCache(ttl=settings.DASHBOARD_CACHE_TTL)
+
+# Models whose changes affect the dashboard counters
+_WATCHED_MODELS = (Morador, Visitante, Visita, Correspondencia)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_dashboard_changes(session, flush_context):
+    """Flag sessions that flushed changes to any counted model"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _WATCHED_MODELS):
+            session.info["dashboard_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dashboard_bulk_changes(orm_execute_state):
+    """Same as above for ORM-enabled UPDATE/DELETE statements"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    for mapper in orm_execute_state.all_mappers:
+        if issubclass(mapper.class_, _WATCHED_MODELS):
+            orm_execute_state.session.info["dashboard_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard_stats(session):
+    if session.info.pop("dashboard_dirty", False):
+        stats_cache.invalidate()
+
 
 class DashboardStats(BaseModel):
     total_moradores: int
@@ -22,41 +58,47 @@ class DashboardStats(BaseModel):
     correspondencias_aguardando: int
 
 
+async def _load_dashboard_stats(db: AsyncSession, hoje: date) -> DashboardStats:
+    # Half-open range keeps the filter sargable (index on data_prevista)
+    inicio_dia = datetime.combine(hoje, datetime.min.time())
+    fim_dia = inicio_dia + timedelta(days=1)
+
+    def count(column, *criteria):
+        return select(func.count(column)).where(*criteria).scalar_subquery()
+
+    # All counters in a single round trip
+    row = (await db.execute(
+        select(
+            count(Morador.id, Morador.is_active == True).label("total_moradores"),
+            select(func.count(Visitante.id)).scalar_subquery().label("total_visitantes"),
+            count(
+                Visita.id,
+                Visita.data_prevista >= inicio_dia,
+                Visita.data_prevista < fim_dia
+            ).label("visitantes_hoje"),
+            count(Visita.id, Visita.status == StatusVisita.DENTRO).label("visitas_dentro"),
+            count(
+                Correspondencia.id,
+                Correspondencia.status == StatusCorrespondencia.AGUARDANDO_RETIRADA
+            ).label("correspondencias_aguardando"),
+        )
+    )).one()
+
+    return DashboardStats(
+        total_moradores=row.total_moradores or 0,
+        total_visitantes=row.total_visitantes or 0,
+        visitantes_hoje=row.visitantes_hoje or 0,
+        visitas_dentro=row.visitas_dentro or 0,
+        correspondencias_aguardando=row.correspondencias_aguardando or 0
+    )
+
+
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
     """
     Get all dashboard statistics in a single optimized query.
-    Returns counts instead of loading all records.
+    Cached for DASHBOARD_CACHE_TTL seconds; concurrent polls share one query
+    and any commit touching visits, residents, visitors or mail invalidates it.
     """
     hoje = date.today()
-    
-    # Count moradores ativos
-    total_moradores = db.query(func.count(Morador.id)).filter(
-        Morador.is_active == True
-    ).scalar() or 0
-    
-    # Count visitantes total
-    total_visitantes = db.query(func.count(Visitante.id)).scalar() or 0
-    
-    # Count visitantes programados para hoje
-    visitantes_hoje = db.query(func.count(Visita.id)).filter(
-        func.date(Visita.data_prevista) == hoje
-    ).scalar() or 0
-    
-    # Count visitas com status DENTRO
-    visitas_dentro = db.query(func.count(Visita.id)).filter(
-        Visita.status == "DENTRO"
-    ).scalar() or 0
-    
-    # Count correspondências aguardando retirada
-    correspondencias_aguardando = db.query(func.count(Correspondencia.id)).filter(
-        Correspondencia.status == StatusCorrespondencia.AGUARDANDO_RETIRADA
-    ).scalar() or 0
-    
-    return DashboardStats(
-        total_moradores=total_moradores,
-        total_visitantes=total_visitantes,
-        visitantes_hoje=visitantes_hoje,
-        visitas_dentro=visitas_dentro,
-        correspondencias_aguardando=correspondencias_aguardando
-    )
+    return await stats_cache.get_or_load(hoje, lambda: _load_dashboard_stats(db, hoje))
@@ -0,0 +1,124 @@
+"""Gate node sync endpoints (central side of app.core.gate)"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+from datetime import datetime, timedelta
+import secrets
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.entries import apply_entries
+from app.core.gate import GATE_KEY_HEADER
+from app.core.nonces import nonce_store
+from app.models.visita import Visita, StatusVisita
+from pydantic import BaseModel, Field
+
+router = APIRouter()
+
+
+async def verify_gate_key(x_gate_key: str = Header("", alias=GATE_KEY_HEADER)):
+    """Gate nodes authenticate with the shared GATE_SYNC_KEY"""
+    if not settings.GATE_SYNC_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sincronização de portarias desabilitada"
+        )
+    if not secrets.compare_digest(x_gate_key.encode(), settings.GATE_SYNC_KEY.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Chave de portaria inválida"
+        )
+
+
+# Schemas
+class ReplicaVisita(BaseModel):
+    id: UUID
+    visitante_id: UUID
+    qr_nonce: str
+    qr_signature: str
+    valido_ate: datetime
+    status: StatusVisita
+    data_entrada: datetime | None
+
+
+class ReplicaResponse(BaseModel):
+    synced_at: datetime  # pass back as ?since= on the next pull
+    visitas: List[ReplicaVisita]
+
+
+class GateEntry(BaseModel):
+    visita_id: UUID
+    entrada_em: datetime
+
+
+class GateEntriesRequest(BaseModel):
+    gate_id: str
+    entries: List[GateEntry] = Field(..., max_length=5000)
+
+
+@router.get("/replica", response_model=ReplicaResponse, dependencies=[Depends(verify_gate_key)])
+async def get_replica(
+    since: datetime | None = Query(None, description="synced_at da última sincronização"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Visits with a QR Code still valid, changed since the last pull (all of
+    them without since). updated_at is stamped at flush, so a visit can
+    commit after this read with an updated_at before it: synced_at steps
+    back GATE_REPLICA_OVERLAP seconds and the next pull re-reads that
+    window (the replica upsert is idempotent).
+    """
+    now = datetime.utcnow()
+    query = select(
+        Visita.id, Visita.visitante_id, Visita.qr_nonce, Visita.qr_signature,
+        Visita.valido_ate, Visita.status, Visita.data_entrada
+    ).where(
+        Visita.qr_nonce.is_not(None),
+        Visita.valido_ate > now
+    )
+    if since is not None:
+        query = query.where(Visita.updated_at >= since)
+
+    rows = (await db.execute(query)).all()
+    return {"synced_at": now - timedelta(seconds=settings.GATE_REPLICA_OVERLAP), "visitas": rows}
+
+
+@router.post("/entries", dependencies=[Depends(verify_gate_key)])
+async def receive_entries(request: GateEntriesRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Entries registered offline by a gate node, applied in one transaction.
+    Earliest entry wins: a visit already entered earlier (at another gate
+    or online) answers "conflict" with the entry time that was kept.
+    """
+    ids = {entry.visita_id for entry in request.entries}
+    current = {
+        row.id: row
+        for row in (await db.execute(
+            select(Visita.id, Visita.qr_nonce, Visita.valido_ate, Visita.data_entrada).where(Visita.id.in_(ids))
+        )).all()
+    }
+
+    results = []
+    earliest = {}
+    for entry in request.entries:
+        row = current.get(entry.visita_id)
+        if row is None:
+            results.append({"status": "not_found"})
+            continue
+        kept = min(filter(None, (row.data_entrada, earliest.get(row.id))), default=None)
+        if kept is not None and kept <= entry.entrada_em:
+            results.append({"status": "conflict", "entrada_em": kept.isoformat()})
+            continue
+        earliest[row.id] = entry.entrada_em
+        results.append({"status": "applied", "entrada_em": entry.entrada_em.isoformat()})
+
+    await apply_entries(db, earliest)
+    await db.commit()
+
+    for visita_id, entrada_em in earliest.items():
+        row = current[visita_id]
+        await nonce_store.add(row.qr_nonce, entrada_em, row.valido_ate)
+
+    return {"gate_id": request.gate_id, "results": results}
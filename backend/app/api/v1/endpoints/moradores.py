@@ -1,10 +1,12 @@
 """Moradores (residents) endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import paginate, page_items, NEXT_CURSOR_HEADER
 from app.models.morador import Morador
 from pydantic import BaseModel
 from datetime import date
@@ -40,20 +42,33 @@ class MoradorResponse(BaseModel):
 
 @router.get("", response_model=List[MoradorResponse])
 async def list_moradores(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    skip: int | None = Query(None, deprecated=True, description="Legado: use cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all residents with pagination (default limit: 50)"""
-    moradores = db.query(Morador).filter(Morador.is_active == True).offset(skip).limit(limit).all()
+    """
+    List all residents with pagination (default limit: 50)
+    Oldest first; pass the X-Next-Cursor response header back as cursor
+    """
+    rows = (await db.scalars(
+        paginate(
+            select(Morador).where(Morador.is_active == True), Morador.created_at, Morador.id,
+            limit=limit, cursor=cursor, skip=skip, descending=False
+        )
+    )).all()
+    moradores, next_cursor = page_items(rows, limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return moradores
 
 
 @router.post("", response_model=MoradorResponse, status_code=status.HTTP_201_CREATED)
-async def create_morador(morador_data: MoradorCreate, db: Session = Depends(get_db)):
+async def create_morador(morador_data: MoradorCreate, db: AsyncSession = Depends(get_async_db)):
     """Create new resident"""
     # Check if CPF already exists
-    existing = db.query(Morador).filter(Morador.cpf == morador_data.cpf).first()
+    existing = await db.scalar(select(Morador).where(Morador.cpf == morador_data.cpf))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,16 +78,16 @@ async def create_morador(morador_data: MoradorCreate, db: Session = Depends(get_
     # Create morador
     morador = Morador(**morador_data.model_dump())
     db.add(morador)
-    db.commit()
-    db.refresh(morador)
+    await db.commit()
+    await db.refresh(morador)
     
     return morador
 
 
 @router.get("/{morador_id}", response_model=MoradorResponse)
-async def get_morador(morador_id: UUID, db: Session = Depends(get_db)):
+async def get_morador(morador_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get resident by ID"""
-    morador = db.query(Morador).filter(Morador.id == morador_id).first()
+    morador = await db.scalar(select(Morador).where(Morador.id == morador_id))
     
     if not morador:
         raise HTTPException(
@@ -87,10 +102,10 @@ async def get_morador(morador_id: UUID, db: Session = Depends(get_db)):
 async def update_morador(
     morador_id: UUID,
     morador_data: MoradorCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update resident"""
-    morador = db.query(Morador).filter(Morador.id == morador_id).first()
+    morador = await db.scalar(select(Morador).where(Morador.id == morador_id))
     
     if not morador:
         raise HTTPException(
@@ -102,16 +117,16 @@ async def update_morador(
     for field, value in morador_data.model_dump(exclude_unset=True).items():
         setattr(morador, field, value)
     
-    db.commit()
-    db.refresh(morador)
+    await db.commit()
+    await db.refresh(morador)
     
     return morador
 
 
 @router.delete("/{morador_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_morador(morador_id: UUID, db: Session = Depends(get_db)):
+async def delete_morador(morador_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Soft delete resident (set is_active = False)"""
-    morador = db.query(Morador).filter(Morador.id == morador_id).first()
+    morador = await db.scalar(select(Morador).where(Morador.id == morador_id))
     
     if not morador:
         raise HTTPException(
@@ -120,6 +135,6 @@ async def delete_morador(morador_id: UUID, db: Session = Depends(get_db)):
         )
     
     morador.is_active = False
-    db.commit()
+    await db.commit()
     
     return None
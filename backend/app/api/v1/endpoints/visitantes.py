@@ -1,12 +1,14 @@
 """Visitantes (visitors) endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any, Optional
 from uuid import UUID
 from datetime import datetime, date
 
-from app.core.database import get_db
+from app.core.blacklist import blacklist_index
+from app.core.database import get_async_db
+from app.core.pagination import paginate, page_items, NEXT_CURSOR_HEADER
 from app.models.visitante import Visitante, TipoDocumento
 from app.models.visita import Visita
 from pydantic import BaseModel
@@ -40,6 +42,10 @@ class VisitanteResponse(BaseModel):
         }
 
 
+class BlacklistCheckResponse(BaseModel):
+    blacklisted: bool
+
+
 class VisitanteProgramacaoResponse(BaseModel):
     id: Any
     nome_completo: str
@@ -59,17 +65,30 @@ class VisitanteProgramacaoResponse(BaseModel):
 
 @router.get("", response_model=List[VisitanteResponse])
 async def list_visitantes(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    skip: int | None = Query(None, deprecated=True, description="Legado: use cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all visitors with pagination (default limit: 50)"""
-    visitantes = db.query(Visitante).offset(skip).limit(limit).all()
+    """
+    List all visitors with pagination (default limit: 50)
+    Oldest first; pass the X-Next-Cursor response header back as cursor
+    """
+    rows = (await db.scalars(
+        paginate(
+            select(Visitante), Visitante.created_at, Visitante.id,
+            limit=limit, cursor=cursor, skip=skip, descending=False
+        )
+    )).all()
+    visitantes, next_cursor = page_items(rows, limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return visitantes
 
 
 @router.post("", response_model=VisitanteResponse, status_code=status.HTTP_201_CREATED)
-async def create_visitante(visitante_data: VisitanteCreate, db: Session = Depends(get_db)):
+async def create_visitante(visitante_data: VisitanteCreate, db: AsyncSession = Depends(get_async_db)):
     """Create new visitor"""
     # Extrai data_visita do payload
     data_dict = visitante_data.model_dump()
@@ -78,8 +97,8 @@ async def create_visitante(visitante_data: VisitanteCreate, db: Session = Depend
     # Cria visitante
     visitante = Visitante(**data_dict)
     db.add(visitante)
-    db.commit()
-    db.refresh(visitante)
+    await db.commit()
+    await db.refresh(visitante)
     
     # Se data_visita foi informada, cria uma visita programada
     if data_visita:
@@ -91,7 +110,7 @@ async def create_visitante(visitante_data: VisitanteCreate, db: Session = Depend
         if unidade_id:
             # Valida se unidade existe
             from app.models.unidade import Unidade
-            unidade_existe = db.query(Unidade).filter(Unidade.id == unidade_id).first()
+            unidade_existe = await db.scalar(select(Unidade).where(Unidade.id == unidade_id))
             
             if unidade_existe:
                 nova_visita = Visita(
@@ -102,15 +121,55 @@ async def create_visitante(visitante_data: VisitanteCreate, db: Session = Depend
                     motivo="Visita programada no cadastro"
                 )
                 db.add(nova_visita)
-                db.commit()
+                await db.commit()
     
     return visitante
 
 
+@router.get("/frequentes", response_model=List[VisitanteResponse])
+async def list_visitantes_frequentes(
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Visitors with the most visits entered (indexed sort on total_visitas)"""
+    visitantes = (await db.scalars(
+        select(Visitante)
+        .where(Visitante.total_visitas > 0)
+        .order_by(Visitante.total_visitas.desc(), Visitante.id.desc())
+        .limit(limit)
+    )).all()
+    return visitantes
+
+
+@router.get("/blacklist/check", response_model=BlacklistCheckResponse)
+async def check_blacklist(visitante_id: UUID | None = None, documento: str | None = None):
+    """
+    Is this visitor or document blacklisted? (gate hardware, walk-ins)
+    Answered from the in-memory index, without a query
+    """
+    if visitante_id is None and not documento:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Informe visitante_id ou documento"
+        )
+    blacklisted = blacklist_index.check(visitante_id, documento or None)
+    if blacklisted is None:
+        # Startup load failed: try again now rather than answering "not blacklisted"
+        await blacklist_index.rebuild()
+        blacklisted = blacklist_index.check(visitante_id, documento or None)
+    if blacklisted is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Blacklist indisponível",
+            headers={"Retry-After": "5"}
+        )
+    return {"blacklisted": blacklisted}
+
+
 @router.get("/{visitante_id}", response_model=VisitanteResponse)
-async def get_visitante(visitante_id: UUID, db: Session = Depends(get_db)):
+async def get_visitante(visitante_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get visitor by ID"""
-    visitante = db.query(Visitante).filter(Visitante.id == visitante_id).first()
+    visitante = await db.scalar(select(Visitante).where(Visitante.id == visitante_id))
     
     if not visitante:
         raise HTTPException(
@@ -122,11 +181,13 @@ async def get_visitante(visitante_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/documento/{numero_documento}", response_model=VisitanteResponse)
-async def get_visitante_by_documento(numero_documento: str, db: Session = Depends(get_db)):
+async def get_visitante_by_documento(numero_documento: str, db: AsyncSession = Depends(get_async_db)):
     """Search visitor by document number"""
-    visitante = db.query(Visitante).filter(
-        Visitante.numero_documento == numero_documento
-    ).first()
+    visitante = await db.scalar(
+        select(Visitante).where(
+            Visitante.numero_documento == numero_documento
+        ).limit(1)
+    )
     
     if not visitante:
         raise HTTPException(
@@ -140,7 +201,7 @@ async def get_visitante_by_documento(numero_documento: str, db: Session = Depend
 @router.get("/programacao/data", response_model=List[VisitanteProgramacaoResponse])
 async def listar_visitantes_por_data(
     data: Optional[date] = Query(None, description="Data da visita (YYYY-MM-DD). Se não informada, usa data atual."),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Lista visitantes programados para uma data específica"""
     # Se não informar data, usa hoje
@@ -151,23 +212,25 @@ async def listar_visitantes_por_data(
     inicio_dia = datetime.combine(data, datetime.min.time())
     fim_dia = datetime.combine(data, datetime.max.time())
     
-    visitas = db.query(
-        Visitante.id,
-        Visitante.nome_completo,
-        Visitante.tipo_documento,
-        Visitante.numero_documento,
-        Visitante.telefone,
-        Visita.data_prevista,
-        Visita.status.label('status_visita'),
-        Visita.motivo
-    ).join(
-        Visita, Visitante.id == Visita.visitante_id
-    ).filter(
-        Visita.data_prevista >= inicio_dia,
-        Visita.data_prevista <= fim_dia
-    ).order_by(
-        Visita.data_prevista
-    ).all()
+    visitas = (await db.execute(
+        select(
+            Visitante.id,
+            Visitante.nome_completo,
+            Visitante.tipo_documento,
+            Visitante.numero_documento,
+            Visitante.telefone,
+            Visita.data_prevista,
+            Visita.status.label('status_visita'),
+            Visita.motivo
+        ).join(
+            Visita, Visitante.id == Visita.visitante_id
+        ).where(
+            Visita.data_prevista >= inicio_dia,
+            Visita.data_prevista <= fim_dia
+        ).order_by(
+            Visita.data_prevista
+        )
+    )).all()
     
     return [
         {
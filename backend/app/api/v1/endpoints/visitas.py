@@ -1,19 +1,32 @@
 """Visitas (visits) endpoints with QR Code generation"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Any, Literal
 from uuid import UUID
-from datetime import datetime, timedelta
-import qrcode
-import io
+from datetime import datetime, timedelta, timezone
 import base64
+import hashlib
 import json
+import secrets
 
-from app.core.database import get_db
-from app.core.security import sign_qr_code_data, generate_nonce, verify_qr_code_signature
+from app.core.blacklist import blacklist_index
+from app.core.database import get_async_db
+from app.core.entries import apply_entries, increment_visit_count
+from app.core.gate import gate_node
+from app.core.metrics import count_qr_validation
+from app.core.nonces import nonce_store
+from app.core.pagination import paginate, page_items, NEXT_CURSOR_HEADER
+from app.core.qr import qr_image_cache, negotiate_qr_format, QR_ERROR_LEVEL, QR_MEDIA_TYPES
+from app.core.qr_payload import (
+    QR_NONCE_SIZE, InvalidQRPayload, pack_qr_body, encode_compact_qr, decode_compact_qr, is_compact_qr
+)
+from app.core.security import (
+    qr_signer, sign_qr_code_data, verify_qr_code_signature, verify_qr_code_signatures
+)
 from app.models.visita import Visita, StatusVisita, TipoVisita
 from app.models.visitante import Visitante
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 
@@ -52,67 +65,89 @@ class QRCodeResponse(BaseModel):
     valido_ate: str
 
 
+class QRScan(BaseModel):
+    """One scan read offline: compact token or the legacy JSON fields"""
+    qr: str | None = None
+    visitor_id: str | None = None
+    unit_id: str | None = None
+    valid_until: str | None = None
+    nonce: str | None = None
+    signature: str | None = None
+    scanned_at: datetime
+
+
+class QRScanBatch(BaseModel):
+    scans: List[QRScan] = Field(..., max_length=5000)
+
+
 @router.get("", response_model=List[VisitaResponse])
 async def list_visitas(
+    response: Response,
     status_filter: str | None = None,
-    skip: int = 0,
+    cursor: str | None = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    skip: int | None = Query(None, deprecated=True, description="Legado: use cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List visits with optional status filter (default limit: 50)"""
-    query = db.query(Visita)
+    """
+    List visits with optional status filter (default limit: 50)
+    Newest first; pass the X-Next-Cursor response header back as cursor
+    """
+    query = select(Visita)
     
     if status_filter:
-        query = query.filter(Visita.status == status_filter)
-    
-    visitas = query.order_by(Visita.created_at.desc()).offset(skip).limit(limit).all()
+        query = query.where(Visita.status == status_filter)
+    
+    rows = (await db.scalars(
+        paginate(query, Visita.created_at, Visita.id, limit=limit, cursor=cursor, skip=skip)
+    )).all()
+    visitas, next_cursor = page_items(rows, limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return visitas
 
 
 @router.post("", response_model=VisitaResponse, status_code=status.HTTP_201_CREATED)
-async def create_visita(visita_data: VisitaCreate, db: Session = Depends(get_db)):
+async def create_visita(visita_data: VisitaCreate, db: AsyncSession = Depends(get_async_db)):
     """Pre-register visit and generate QR Code"""
-    # Verify visitor exists
-    visitante = db.query(Visitante).filter(Visitante.id == visita_data.visitante_id).first()
-    if not visitante:
+    # Verify visitor exists (primary key only)
+    visitante_id = await db.scalar(select(Visitante.id).where(Visitante.id == visita_data.visitante_id))
+    if not visitante_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visitante not found"
         )
     
-    # Check blacklist
-    if visitante.is_blacklisted:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"Visitante bloqueado: {visitante.blacklist_reason}"
-        )
+    # Check blacklist in memory; only a hit (or an index not built yet) reads the row
+    if blacklist_index.check(visitante_id) is not False:
+        blacklisted = (await db.execute(
+            select(Visitante.is_blacklisted, Visitante.blacklist_reason).where(Visitante.id == visitante_id)
+        )).first()
+        if blacklisted.is_blacklisted:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Visitante bloqueado: {blacklisted.blacklist_reason}"
+            )
     
     # Validate unit exists
     from app.models.unidade import Unidade
-    unidade = db.query(Unidade).filter(Unidade.id == visita_data.unidade_id).first()
+    unidade = await db.scalar(select(Unidade).where(Unidade.id == visita_data.unidade_id))
     if not unidade:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Unidade não encontrada"
         )
     
-    # Calculate expiry
-    valido_ate = datetime.utcnow() + timedelta(hours=visita_data.validade_horas)
-    
-    # Generate nonce
-    nonce = generate_nonce()
-    
-    # Create QR Code data
-    qr_data = {
-        "visitor_id": str(visita_data.visitante_id),
-        "unit_id": str(visita_data.unidade_id),
-        "valid_until": valido_ate.isoformat(),
-        "nonce": nonce
-    }
+    # Calculate expiry (whole seconds, as carried by the QR Code)
+    valido_ate = (datetime.utcnow() + timedelta(hours=visita_data.validade_horas)).replace(microsecond=0)
     
-    # Sign data
-    signature = sign_qr_code_data(qr_data, nonce)
-    qr_data["signature"] = signature
+    # Compact signed QR Code payload (app.core.qr_payload)
+    nonce = secrets.token_bytes(QR_NONCE_SIZE)
+    qr_body = pack_qr_body(
+        visita_data.visitante_id, visita_data.unidade_id, valido_ate, nonce,
+        key_id=qr_signer.active_key_id
+    )
+    signature = sign_qr_code_data(qr_body)
     
     # Create visit record
     visita = Visita(
@@ -122,23 +157,42 @@ async def create_visita(visita_data: VisitaCreate, db: Session = Depends(get_db)
         motivo=visita_data.motivo,
         data_prevista=visita_data.data_prevista or datetime.utcnow(),
         valido_ate=valido_ate,
-        qr_code=json.dumps(qr_data),
-        qr_nonce=nonce,
+        qr_code=encode_compact_qr(qr_body, signature),
+        qr_nonce=nonce.hex(),
         qr_signature=signature,
         status=StatusVisita.AUTORIZADA
     )
     
     db.add(visita)
-    db.commit()
-    db.refresh(visita)
+    await db.commit()
+    await db.refresh(visita)
     
     return visita
 
 
-@router.get("/{visita_id}/qrcode", response_model=QRCodeResponse)
-async def get_qr_code(visita_id: UUID, db: Session = Depends(get_db)):
-    """Generate QR Code image for visit"""
-    visita = db.query(Visita).filter(Visita.id == visita_id).first()
+@router.get(
+    "/{visita_id}/qrcode",
+    response_model=QRCodeResponse,
+    responses={200: {"content": {media: {} for media in QR_MEDIA_TYPES.values()}}}
+)
+async def get_qr_code(
+    visita_id: UUID,
+    request: Request,
+    response: Response,
+    format: Literal["json", "png", "svg"] | None = Query(
+        None, description="Formato da resposta; sem ele vale o header Accept"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    QR Code image for visit
+    json (default): base64 PNG data URI plus payload; png/svg: raw image bytes.
+    Rendered once per (visit, signature) and served from cache; supports
+    If-None-Match so re-opening an invite returns 304 without a body
+    """
+    kind = format or negotiate_qr_format(request.headers.get("accept", ""))
+    
+    visita = await db.scalar(select(Visita).where(Visita.id == visita_id))
     
     if not visita:
         raise HTTPException(
@@ -152,36 +206,47 @@ async def get_qr_code(visita_id: UUID, db: Session = Depends(get_db)):
             detail="QR Code not generated for this visit"
         )
     
-    # Parse QR Code data - handle both JSON and simple string formats
-    try:
-        qr_data = json.loads(visita.qr_code)
-    except (json.JSONDecodeError, TypeError):
-        # Simple string format (from test data) - create proper structure
+    # Parse QR Code data - compact token, legacy JSON or simple string formats
+    if is_compact_qr(visita.qr_code):
         qr_data = {
-            "visit_id": str(visita.id),
+            "qr": visita.qr_code,
             "visitor_id": str(visita.visitante_id),
             "unit_id": str(visita.unidade_id),
-            "qr_code": visita.qr_code,
-            "valid_until": visita.valido_ate.isoformat() if visita.valido_ate else None,
-            "status": visita.status.value if hasattr(visita.status, 'value') else str(visita.status)
+            "valid_until": visita.valido_ate.isoformat() if visita.valido_ate else None
         }
-    
-    # Generate QR Code image
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(json.dumps(qr_data))
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to base64
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    img_base64 = base64.b64encode(buffer.getvalue()).decode()
+        payload = visita.qr_code
+    else:
+        try:
+            qr_data = json.loads(visita.qr_code)
+        except (json.JSONDecodeError, TypeError):
+            # Simple string format (from test data) - create proper structure
+            qr_data = {
+                "visit_id": str(visita.id),
+                "visitor_id": str(visita.visitante_id),
+                "unit_id": str(visita.unidade_id),
+                "qr_code": visita.qr_code,
+                "valid_until": visita.valido_ate.isoformat() if visita.valido_ate else None,
+                "status": visita.status.value if hasattr(visita.status, 'value') else str(visita.status)
+            }
+        payload = json.dumps(qr_data)
+    
+    # The signature pins the payload; legacy rows without one use its digest
+    # (and the error correction level, so images rendered at another level are not reused)
+    qr_key = (visita.qr_signature or hashlib.sha256(payload.encode()).hexdigest())[:32] + f"-{QR_ERROR_LEVEL}"
+    etag = f'"{qr_key}-{kind}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+    
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    image_kind = "png" if kind == "json" else kind
+    image = await qr_image_cache.get_image(f"{visita.id}-{qr_key}", payload, image_kind)
+    
+    if kind != "json":
+        return Response(content=image, media_type=QR_MEDIA_TYPES[kind], headers=cache_headers)
+    
+    img_base64 = base64.b64encode(image).decode()
+    response.headers.update(cache_headers)
     
     valido_ate_str = visita.valido_ate.isoformat() if visita.valido_ate else datetime.utcnow().isoformat()
     
@@ -192,48 +257,136 @@ async def get_qr_code(visita_id: UUID, db: Session = Depends(get_db)):
     }
 
 
+# validate-qr errors by result, as counted in the metrics
+_QR_ERROR_RESULTS = {
+    status.HTTP_400_BAD_REQUEST: "invalid",
+    status.HTTP_403_FORBIDDEN: "forged",
+    status.HTTP_404_NOT_FOUND: "not_found",
+    status.HTTP_410_GONE: "expired",
+}
+
+
 @router.post("/validate-qr", status_code=status.HTTP_200_OK)
-async def validate_qr_code(qr_data: dict, db: Session = Depends(get_db)):
-    """Validate QR Code signature and register entry"""
-    # Extract data
-    visitor_id = qr_data.get("visitor_id")
-    unit_id = qr_data.get("unit_id")
-    valid_until = qr_data.get("valid_until")
-    nonce = qr_data.get("nonce")
-    signature = qr_data.get("signature")
-    
-    if not all([visitor_id, unit_id, valid_until, nonce, signature]):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="QR Code inválido: dados incompletos"
-        )
-    
-    # Verify signature
-    data_to_verify = {
-        "visitor_id": visitor_id,
-        "unit_id": unit_id,
-        "valid_until": valid_until
-    }
-    
-    if not verify_qr_code_signature(data_to_verify, signature, nonce):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="QR Code FALSIFICADO - Assinatura inválida"
-        )
+async def validate_qr_code(qr_data: dict, db: AsyncSession = Depends(get_async_db)):
+    """
+    Validate QR Code signature and register entry
+    Body: {"qr": "PT:..."} for compact codes, or the legacy JSON fields
+    """
+    try:
+        result = await _validate_qr_code(qr_data, db)
+    except HTTPException as e:
+        count_qr_validation(_QR_ERROR_RESULTS.get(e.status_code, "error"))
+        raise
+    count_qr_validation(result["status"])
+    return result
+
+
+async def _validate_qr_code(qr_data: dict, db: AsyncSession) -> dict:
+    if "qr" in qr_data:
+        try:
+            qr = decode_compact_qr(qr_data["qr"])
+        except InvalidQRPayload as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"QR Code inválido: {e}"
+            )
+        
+        if not verify_qr_code_signature(qr.body, qr.signature):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="QR Code FALSIFICADO - Assinatura inválida"
+            )
+        
+        nonce, signature, valid_until_dt = qr.nonce, qr.signature, qr.valid_until
+    else:
+        # Legacy JSON payload
+        visitor_id = qr_data.get("visitor_id")
+        unit_id = qr_data.get("unit_id")
+        valid_until = qr_data.get("valid_until")
+        nonce = qr_data.get("nonce")
+        signature = qr_data.get("signature")
+        
+        if not all([visitor_id, unit_id, valid_until, nonce, signature]):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="QR Code inválido: dados incompletos"
+            )
+        
+        # Verify signature
+        data_to_verify = {
+            "visitor_id": visitor_id,
+            "unit_id": unit_id,
+            "valid_until": valid_until
+        }
+        
+        if not verify_qr_code_signature(data_to_verify, signature, nonce):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="QR Code FALSIFICADO - Assinatura inválida"
+            )
+        
+        try:
+            valid_until_dt = datetime.fromisoformat(valid_until)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="QR Code inválido"
+            )
     
     # Check expiry
-    valid_until_dt = datetime.fromisoformat(valid_until)
     if datetime.utcnow() > valid_until_dt:
         raise HTTPException(
             status_code=status.HTTP_410_GONE,
             detail="QR Code expirado"
         )
     
-    # Find visit
-    visita = db.query(Visita).filter(
-        Visita.qr_nonce == nonce,
-        Visita.qr_signature == signature
-    ).first()
+    # Repeat scan of a code already used: answered from the nonce cache
+    entrada_em = await nonce_store.get(nonce)
+    if entrada_em:
+        return {
+            "status": "already_used",
+            "message": "QR Code já utilizado",
+            "entrada_em": entrada_em
+        }
+    
+    if gate_node is not None:
+        # Gate node: validated against the local replica, synced later
+        return await _register_entry_at_gate(nonce, signature, valid_until_dt)
+    
+    # Register entry: one conditional UPDATE, so concurrent scans of the
+    # same code at different gates can only succeed once
+    entrada = await db.execute(
+        update(Visita)
+        .where(
+            Visita.qr_nonce == nonce,
+            Visita.qr_signature == signature,
+            Visita.data_entrada.is_(None)
+        )
+        .values(data_entrada=datetime.utcnow(), status=StatusVisita.DENTRO)
+        .returning(Visita.visitante_id, Visita.data_entrada)
+        .execution_options(synchronize_session=False)
+    )
+    entrada = entrada.first()
+    if entrada:
+        await increment_visit_count(db, entrada.visitante_id)
+    await db.commit()
+    
+    if entrada:
+        await nonce_store.add(nonce, entrada.data_entrada, valid_until_dt)
+        return {
+            "status": "success",
+            "message": "Entrada autorizada",
+            "visitante_nome": entrada.visitante_id,
+            "entrada_em": entrada.data_entrada.isoformat()
+        }
+    
+    # Nothing updated: unknown code or entry already registered
+    visita = (await db.execute(
+        select(Visita.data_entrada).where(
+            Visita.qr_nonce == nonce,
+            Visita.qr_signature == signature
+        )
+    )).first()
     
     if not visita:
         raise HTTPException(
@@ -241,19 +394,30 @@ async def validate_qr_code(qr_data: dict, db: Session = Depends(get_db)):
             detail="Visita não encontrada"
         )
     
-    # Check if already used
-    if visita.data_entrada:
+    await nonce_store.add(nonce, visita.data_entrada, valid_until_dt)
+    return {
+        "status": "already_used",
+        "message": "QR Code já utilizado",
+        "entrada_em": visita.data_entrada.isoformat()
+    }
+
+
+async def _register_entry_at_gate(nonce: str, signature: str, valid_until_dt: datetime) -> dict:
+    result = await gate_node.register_entry(nonce, signature)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Visita não encontrada"
+        )
+    
+    registered, visita = result
+    await nonce_store.add(nonce, visita.data_entrada, valid_until_dt)
+    if not registered:
         return {
             "status": "already_used",
             "message": "QR Code já utilizado",
             "entrada_em": visita.data_entrada.isoformat()
         }
-    
-    # Register entry
-    visita.data_entrada = datetime.utcnow()
-    visita.status = StatusVisita.DENTRO
-    db.commit()
-    
     return {
         "status": "success",
         "message": "Entrada autorizada",
@@ -262,10 +426,121 @@ async def validate_qr_code(qr_data: dict, db: Session = Depends(get_db)):
     }
 
 
+@router.post("/validate-qr/batch", status_code=status.HTTP_200_OK)
+async def validate_qr_batch(batch: QRScanBatch, db: AsyncSession = Depends(get_async_db)):
+    """
+    Upload scans read offline, with their original timestamps
+    Signatures are verified in one pass, visits are resolved with a single
+    IN query and entries are applied in one transaction. The earliest scan
+    of a visit wins (also against an entry already registered online).
+    Returns one result per scan, in the order sent.
+    """
+    now = datetime.utcnow()
+    results: List[dict | None] = [None] * len(batch.scans)
+    # index -> (nonce, signature, valid_until, scanned_at)
+    pending = {}
+    compact = []
+
+    for index, scan in enumerate(batch.scans):
+        scanned_at = scan.scanned_at
+        if scanned_at.tzinfo is not None:
+            scanned_at = scanned_at.astimezone(timezone.utc).replace(tzinfo=None)
+        # Reader clock ahead of the server: never register an entry in the future
+        scanned_at = min(scanned_at, now)
+
+        if scan.qr is not None:
+            try:
+                qr = decode_compact_qr(scan.qr)
+            except InvalidQRPayload as e:
+                results[index] = {"status": "invalid", "message": f"QR Code inválido: {e}"}
+                continue
+            compact.append((index, qr))
+            pending[index] = (qr.nonce, qr.signature, qr.valid_until, scanned_at)
+            continue
+
+        # Legacy JSON payload, verified one by one
+        if not all([scan.visitor_id, scan.unit_id, scan.valid_until, scan.nonce, scan.signature]):
+            results[index] = {"status": "invalid", "message": "QR Code inválido: dados incompletos"}
+            continue
+        data_to_verify = {"visitor_id": scan.visitor_id, "unit_id": scan.unit_id, "valid_until": scan.valid_until}
+        if not verify_qr_code_signature(data_to_verify, scan.signature, scan.nonce):
+            results[index] = {"status": "forged", "message": "QR Code FALSIFICADO - Assinatura inválida"}
+            continue
+        try:
+            valid_until_dt = datetime.fromisoformat(scan.valid_until)
+        except ValueError:
+            results[index] = {"status": "invalid", "message": "QR Code inválido: validade"}
+            continue
+        pending[index] = (scan.nonce, scan.signature, valid_until_dt, scanned_at)
+
+    # Compact codes: one vectorized verify pass
+    verified = verify_qr_code_signatures((qr.body, qr.signature) for _, qr in compact)
+    for (index, _), valid in zip(compact, verified):
+        if not valid:
+            del pending[index]
+            results[index] = {"status": "forged", "message": "QR Code FALSIFICADO - Assinatura inválida"}
+
+    for index, (_, _, valid_until_dt, scanned_at) in list(pending.items()):
+        if scanned_at > valid_until_dt:
+            del pending[index]
+            results[index] = {"status": "expired", "message": "QR Code expirado"}
+
+    visitas = {}
+    if pending:
+        nonces = {nonce for nonce, _, _, _ in pending.values()}
+        visitas = {
+            row.qr_nonce: row
+            for row in (await db.execute(
+                select(Visita.id, Visita.visitante_id, Visita.qr_nonce, Visita.qr_signature, Visita.data_entrada)
+                .where(Visita.qr_nonce.in_(nonces))
+            )).all()
+        }
+
+    # Earliest scan first, so repeats inside the batch resolve to it
+    earliest = {}
+    winners = {}
+    for index in sorted(pending, key=lambda i: pending[i][3]):
+        nonce, signature, valid_until_dt, scanned_at = pending[index]
+        visita = visitas.get(nonce)
+        if visita is None or visita.qr_signature != signature:
+            results[index] = {"status": "not_found", "message": "Visita não encontrada"}
+            continue
+        if visita.id not in earliest and (visita.data_entrada is None or visita.data_entrada > scanned_at):
+            earliest[visita.id] = scanned_at
+            winners[visita.id] = (index, nonce, valid_until_dt)
+
+    await apply_entries(db, earliest)
+    await db.commit()
+
+    for visita_id, (index, nonce, valid_until_dt) in winners.items():
+        entrada_em = earliest[visita_id]
+        await nonce_store.add(nonce, entrada_em, valid_until_dt)
+        results[index] = {
+            "status": "success",
+            "message": "Entrada autorizada",
+            "visitante_nome": visitas[nonce].visitante_id,
+            "entrada_em": entrada_em.isoformat()
+        }
+
+    for index in pending:
+        if results[index] is None:
+            visita = visitas[pending[index][0]]
+            entrada_em = earliest.get(visita.id) or visita.data_entrada
+            results[index] = {
+                "status": "already_used",
+                "message": "QR Code já utilizado",
+                "entrada_em": entrada_em.isoformat()
+            }
+
+    for result in results:
+        count_qr_validation(result["status"])
+    return {"results": results}
+
+
 @router.post("/{visita_id}/saida", status_code=status.HTTP_200_OK)
-async def register_saida(visita_id: UUID, db: Session = Depends(get_db)):
+async def register_saida(visita_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Register visitor exit"""
-    visita = db.query(Visita).filter(Visita.id == visita_id).first()
+    visita = await db.scalar(select(Visita).where(Visita.id == visita_id))
     
     if not visita:
         raise HTTPException(
@@ -293,7 +568,7 @@ async def register_saida(visita_id: UUID, db: Session = Depends(get_db)):
     duration = (visita.data_saida - visita.data_entrada).total_seconds() / 60
     visita.duracao_minutos = int(duration)
     
-    db.commit()
+    await db.commit()
     
     return {
         "status": "success",
@@ -303,10 +578,12 @@ async def register_saida(visita_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/dentro/agora", response_model=List[VisitaResponse])
-async def visitors_inside_now(db: Session = Depends(get_db)):
+async def visitors_inside_now(db: AsyncSession = Depends(get_async_db)):
     """Get all visitors currently inside"""
-    visitas = db.query(Visita).filter(
-        Visita.status == StatusVisita.DENTRO
-    ).order_by(Visita.data_entrada.desc()).all()
+    visitas = (await db.scalars(
+        select(Visita).where(
+            Visita.status == StatusVisita.DENTRO
+        ).order_by(Visita.data_entrada.desc())
+    )).all()
     
     return visitas
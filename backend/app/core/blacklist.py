@@ -0,0 +1,257 @@
+"""
+Blacklist lookup index
+Every worker keeps the blacklisted visitors in memory, keyed by id and by
+normalized document number, so checks (create_visita, walk-ins at the
+gate) answer without a query. A Bloom filter answers the common "not
+blacklisted" case; its positives are confirmed against the exact sets.
+
+Built at startup, updated by commits that change a visitor's blacklist
+flag or document (or delete it) in this worker, and rebuilt every
+BLACKLIST_REFRESH_INTERVAL seconds to pick up other workers' changes and
+drop the Bloom bits of visitors taken off the list. Until the first build
+succeeds, check() returns None and callers ask the database.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.visitante import Visitante
+
+logger = logging.getLogger(__name__)
+
+# Changing any of these moves a visitor in or out of the index
+_WATCHED_COLUMNS = (Visitante.__table__.c.is_blacklisted, Visitante.__table__.c.numero_documento)
+
+_NOT_DOCUMENT = re.compile(r"[^0-9A-Za-z]")
+
+
+def normalize_documento(numero_documento: str) -> str:
+    """'123.456.789-00' and '12345678900' are the same document"""
+    return _NOT_DOCUMENT.sub("", numero_documento).upper()
+
+
+class BloomFilter:
+    """Fixed-size bit array; k positions per key from one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def _id_key(visitante_id: UUID) -> str:
+    return f"id:{visitante_id}"
+
+
+def _doc_key(documento: str) -> str:
+    return f"doc:{documento}"
+
+
+class BlacklistIndex:
+    """Blacklisted visitor ids and documents (a document may belong to several visitors)"""
+
+    def __init__(self, refresh_interval: float, error_rate: float):
+        self.refresh_interval = refresh_interval
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(0, error_rate)
+        self._ids: Dict[UUID, str] = {}
+        self._documents: Dict[str, Set[UUID]] = {}
+        self.ready = False
+        # Changes committed while a rebuild reads the table, replayed over its result
+        self._replay: Optional[List[Tuple[UUID, Optional[str]]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._refresh_lock = asyncio.Lock()
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        self.failures = 0
+        self.last_rebuild_ms = 0.0
+
+    def check(self, visitante_id: Optional[UUID] = None, documento: Optional[str] = None) -> Optional[bool]:
+        """True if the visitor or document is blacklisted; None while not built yet"""
+        if not self.ready:
+            return None
+        self.checks += 1
+        keys = []
+        if visitante_id is not None:
+            keys.append(_id_key(visitante_id))
+        if documento is not None:
+            keys.append(_doc_key(normalize_documento(documento)))
+        if not any(key in self._bloom for key in keys):
+            self.bloom_negatives += 1
+            return False
+        if visitante_id in self._ids or (documento is not None and normalize_documento(documento) in self._documents):
+            return True
+        self.false_positives += 1
+        return False
+
+    def _add(self, visitante_id: UUID, documento: str) -> None:
+        documento = normalize_documento(documento)
+        self._ids[visitante_id] = documento
+        self._documents.setdefault(documento, set()).add(visitante_id)
+        self._bloom.add(_id_key(visitante_id))
+        self._bloom.add(_doc_key(documento))
+
+    def _remove(self, visitante_id: UUID) -> None:
+        """Exact sets only; the Bloom bits stay until the next rebuild"""
+        documento = self._ids.pop(visitante_id, None)
+        if documento is None:
+            return
+        owners = self._documents.get(documento, set())
+        owners.discard(visitante_id)
+        if not owners:
+            self._documents.pop(documento, None)
+
+    def apply(self, changes: Iterable[Tuple[UUID, Optional[str]]]) -> None:
+        """(id, document) puts a visitor on the list, (id, None) takes it off"""
+        for visitante_id, documento in changes:
+            if self._replay is not None:
+                self._replay.append((visitante_id, documento))
+            self._remove(visitante_id)
+            if documento is not None:
+                self._add(visitante_id, documento)
+
+    async def rebuild(self) -> int:
+        """Reload the blacklisted visitors; returns how many"""
+        async with self._refresh_lock:
+            started = time.perf_counter()
+            self._replay = []
+            try:
+                async with async_engine.connect() as connection:
+                    rows = (await connection.execute(
+                        select(Visitante.id, Visitante.numero_documento).where(Visitante.is_blacklisted.is_(True))
+                    )).all()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Erro ao carregar a blacklist (consultas vão ao banco): {e}")
+                return 0
+            finally:
+                replay, self._replay = self._replay, None
+
+            # Swapped in without awaiting, so checks never see a half-built index
+            self._ids, self._documents = {}, {}
+            self._bloom = BloomFilter(len(rows) * 2, self.error_rate)  # room to grow until the next rebuild
+            for visitante_id, documento in rows:
+                self._add(visitante_id, documento)
+            self.apply(replay)
+            self.ready = True
+            self.rebuilds += 1
+            self.last_rebuild_ms = round((time.perf_counter() - started) * 1000, 3)
+            return len(rows)
+
+    def request_rebuild(self) -> None:
+        """Rebuild soon (changed rows unknown)"""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.rebuild()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "visitantes": len(self._ids),
+            "documentos": len(self._documents),
+            "bloom_bits": self._bloom.size,
+            "checks": self.checks,
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+            "rebuilds": self.rebuilds,
+            "failures": self.failures,
+            "last_rebuild_ms": self.last_rebuild_ms,
+        }
+
+
+blacklist_index = BlacklistIndex(settings.BLACKLIST_REFRESH_INTERVAL, settings.BLACKLIST_BLOOM_ERROR_RATE)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_blacklist_changes(session, flush_context):
+    """Collect visitors whose blacklist flag or document changed, or that were added/deleted"""
+    changes = []
+    for obj in session.deleted:
+        if isinstance(obj, Visitante):
+            changes.append((obj.id, None))
+    for obj in session.new:
+        if isinstance(obj, Visitante) and obj.is_blacklisted:
+            changes.append((obj.id, obj.numero_documento))
+    for obj in session.dirty:
+        if isinstance(obj, Visitante):
+            state = inspect(obj)
+            if any(state.attrs[column.key].history.has_changes() for column in _WATCHED_COLUMNS):
+                changes.append((obj.id, obj.numero_documento if obj.is_blacklisted else None))
+    if changes:
+        session.info.setdefault("blacklist_changes", []).extend(changes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_blacklist_bulk_changes(orm_execute_state):
+    """
+    ORM-enabled UPDATE/DELETE on visitantes: rows unknown, rebuild after
+    commit. UPDATEs that only touch other columns (total_visitas) are skipped.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if not any(issubclass(mapper.class_, Visitante) for mapper in orm_execute_state.all_mappers):
+        return
+    values = getattr(orm_execute_state.statement, "_values", None)
+    if orm_execute_state.is_update and values and not any(column in values for column in _WATCHED_COLUMNS):
+        return
+    orm_execute_state.session.info["blacklist_dirty_all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _update_blacklist_index(session):
+    changes = session.info.pop("blacklist_changes", ())
+    blacklist_index.apply(changes)
+    if session.info.pop("blacklist_dirty_all", False):
+        blacklist_index.request_rebuild()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_blacklist_changes(session):
+    session.info.pop("blacklist_changes", None)
+    session.info.pop("blacklist_dirty_all", None)
@@ -0,0 +1,140 @@
+"""
+In-process caches
+TTL cache with single-flight loading for hot read endpoints, bounded LRU
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Result of a shared load whose caller was cancelled: waiters load again
+_RETRY = object()
+
+
+class AsyncTTLCache:
+    """
+    Small TTL cache for async loaders.
+    Concurrent misses on the same key share a single load (single-flight),
+    and invalidate() discards results of loads that started before it.
+    A loader error is raised to every waiter; if the loading caller is
+    cancelled (client disconnect), the waiters retry with their own loader.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(key)
+        while pending is not None:
+            value = await asyncio.shield(pending)
+            if value is not _RETRY:
+                self.hits += 1
+                return value
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            pending = self._inflight.get(key)
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark as retrieved when nobody else is waiting
+            raise
+        except BaseException:
+            # Cancelled (or interrupted): not the waiters' error, let them load
+            future.set_result(_RETRY)
+            raise
+        else:
+            if generation == self._generation:
+                if len(self._data) >= self.max_entries:
+                    self._data.clear()
+                self._data[key] = (time.monotonic() + self.ttl, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key (or everything) and ignore loads already in flight"""
+        self._generation += 1
+        if key is None:
+            self._data.clear()
+            self._inflight.clear()
+        else:
+            self._data.pop(key, None)
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class LRUCache:
+    """Bounded least-recently-used mapping"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        return self._data.pop(key, None)
+
+    def discard_if(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove every entry whose value matches; returns how many"""
+        keys = [key for key, value in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
@@ -22,16 +22,72 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = f"sqlite:///{DB_PATH}"
+    ASYNC_DATABASE_URL: str = ""  # Empty = derived from DATABASE_URL
+    # Pragmas run on every new SQLite connection ("name=value,..."; empty = SQLite defaults)
+    SQLITE_PRAGMAS: str = (
+        "journal_mode=WAL,synchronous=NORMAL,busy_timeout=5000,"
+        "mmap_size=268435456,cache_size=-65536,temp_store=MEMORY"
+    )
+    DB_POOL_SIZE: int = 5  # connections kept open (and opened at startup)
+    DB_MAX_OVERFLOW: int = 10  # extra connections under load, closed when returned
+    DB_POOL_TIMEOUT: float = 30.0  # seconds waiting for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; replaces connections before server-side timeouts (-1 = never)
+    DB_POOL_PRE_PING: bool = False  # test each connection on checkout (one extra round trip)
+    DB_ECHO: bool = False  # log every SQL statement
+    DB_SLOW_QUERY_MS: int = 200  # log statements slower than this, with the route (0 = off)
+    WRITE_BEHIND_INTERVAL: float = 5.0  # seconds between flushes of buffered non-critical writes
+    WRITE_BEHIND_MAX_PENDING: int = 5000  # flush early once this many rows are buffered
+    DB_AUTO_MIGRATE: bool = True  # run pending migrations at startup (off: deploy runs init_db.py first)
     
     # Security
     SECRET_KEY: str = "sua-chave-secreta-super-segura-aqui-min-32-caracteres"
     QR_SECRET_KEY: str = "chave-para-assinar-qr-codes-min-32-chars"
+    QR_KEY_ID: int = 0  # key id embedded in new QR Codes (0-255)
+    QR_PREVIOUS_KEYS: str = ""  # "id:secret,..." still accepted after rotation
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
-    
+    REFRESH_STORE_BACKEND: str = "memory"  # memory | redis (uses REDIS_URL; needed with several workers)
+    REFRESH_STORE_MAX_ENTRIES: int = 100000  # used refresh tokens + revoked sessions kept per worker
+    # Per-worker auth caches (role/active changes invalidate both)
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096  # verified access tokens -> claims, kept until exp (0 = off)
+    PRINCIPAL_CACHE_TTL: int = 30  # seconds a loaded user (role, active flag) is reused
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+
+    # Password hashing (bcrypt runs on a bounded thread pool)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 2  # seconds
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Cache
+    DASHBOARD_CACHE_TTL: int = 5  # seconds
+    QR_CACHE_MAX_ENTRIES: int = 1024  # rendered QR images kept in memory
+    QR_CACHE_DISK: bool = False  # also persist them under STORAGE_PATH/qrcodes
+    NONCE_CACHE_BACKEND: str = "memory"  # memory | redis (uses REDIS_URL)
+    NONCE_CACHE_MAX_ENTRIES: int = 100000  # consumed QR nonces kept per worker
+    BLACKLIST_REFRESH_INTERVAL: float = 60.0  # seconds between reloads of the in-memory blacklist (other workers' changes)
+    BLACKLIST_BLOOM_ERROR_RATE: float = 0.01  # Bloom filter false positives (confirmed in memory, never wrong)
+    
+    # Gate node (offline QR validation against a local replica)
+    GATE_MODE: bool = False
+    GATE_ID: str = "portaria-1"
+    GATE_CENTRAL_URL: str = ""  # central API base URL, e.g. https://api.exemplo.com
+    GATE_SYNC_KEY: str = ""  # shared secret; empty disables the central /gates endpoints
+    GATE_REPLICA_PATH: str = "./gate_replica.db"
+    GATE_SYNC_INTERVAL: int = 15  # seconds between push/pull rounds
+    GATE_SYNC_BATCH: int = 500  # entries per push request
+    GATE_SYNC_TIMEOUT: float = 10.0  # seconds
+    GATE_ONLINE_TIMEOUT: float = 1.0  # quick pull on a local miss
+    GATE_REPLICA_OVERLAP: int = 60  # seconds each pull re-reads; longer than any write transaction
+
+    # Metrics (Prometheus, GET /metrics)
+    METRICS_ENABLED: bool = True
+    # Shared directory for multi-worker servers (gunicorn/uvicorn --workers); empty = single process
+    PROMETHEUS_MULTIPROC_DIR: str = ""
+    PROFILER_MAX_SECONDS: int = 60  # longest session of POST /admin/profile
     
     # Storage
     STORAGE_PATH: str = "./storage"
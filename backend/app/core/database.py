@@ -1,15 +1,28 @@
 """
 Database Configuration
 SQLAlchemy setup for PostgreSQL or SQLite
+Sync engine for scripts, async engine (asyncpg/aiosqlite) for the API
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy import TypeDecorator, String
-from typing import Generator
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Generator, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import re
+import time
 import uuid
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_IN_USE, DB_POOL_OVERFLOW, DB_POOL_WAIT
+
+logger = logging.getLogger(__name__)
 
 
 # Custom UUID type for SQLite compatibility
@@ -48,28 +61,325 @@ class GUID(TypeDecorator):
                 return value
 
 
+_PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def parse_sqlite_pragmas(profile: str) -> List[Tuple[str, str]]:
+    """Parse a SQLITE_PRAGMAS profile ("journal_mode=WAL,busy_timeout=5000")"""
+    pragmas = []
+    for item in filter(None, (part.strip() for part in profile.split(","))):
+        name, _, value = (part.strip() for part in item.partition("="))
+        if not _PRAGMA_NAME.match(name) or not _PRAGMA_VALUE.match(value):
+            raise ValueError(f"SQLITE_PRAGMAS: pragma inválido {item!r}")
+        pragmas.append((name, value))
+    return pragmas
+
+
+def sqlite_pragma_listener(pragmas: List[Tuple[str, str]]):
+    """
+    Connect event applying the pragmas to each new DBAPI connection.
+    WAL lets readers run alongside the writer, busy_timeout makes writers
+    wait for the lock instead of failing with "database is locked".
+    """
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return set_pragmas
+
+
+def apply_sqlite_pragmas(sync_engine, profile: str = settings.SQLITE_PRAGMAS) -> None:
+    """Register the pragma profile on a SQLite engine (no-op for other databases)"""
+    pragmas = parse_sqlite_pragmas(profile)
+    if sync_engine.dialect.name == "sqlite" and pragmas:
+        event.listen(sync_engine, "connect", sqlite_pragma_listener(pragmas))
+
+
+class PoolMetrics:
+    """Checkout wait times of one pool (per process)"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def stats(self, pool) -> Dict[str, Any]:
+        return {
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+        }
+
+
+class _TimedCheckout:
+    """
+    Pool mixin timing how long each checkout waits for a connection, for
+    /health (PoolMetrics) and Prometheus (wait histogram, in-use/overflow gauges)
+    """
+    metrics: PoolMetrics
+    metrics_label: str
+
+    def _export_usage(self) -> None:
+        DB_POOL_IN_USE.labels(self.metrics_label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self.metrics_label).set(max(self.overflow(), 0))
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.metrics.observe(waited)
+            DB_POOL_WAIT.labels(self.metrics_label).observe(waited)
+            self._export_usage()
+
+    def _do_return_conn(self, record):
+        try:
+            return super()._do_return_conn(record)
+        finally:
+            self._export_usage()
+
+
+# Class-level metrics: they survive pool.recreate() on dispose()
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics = PoolMetrics()
+    metrics_label = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+    metrics_label = "async"
+
+
+class QueryRecord(NamedTuple):
+    fingerprint: str
+    duration: float  # seconds
+    rows: Optional[int]  # driver rowcount; None when unknown (e.g. SQLite SELECT)
+
+
+class QueryStats:
+    """Statements executed while handling one request"""
+    __slots__ = ("count", "duration", "records", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.records: List[QueryRecord] = []
+        self.scope = scope
+
+    @property
+    def route(self) -> str:
+        """Route template once routing has run, raw path before that"""
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "-")
+
+    def record(self, record: QueryRecord) -> None:
+        self.count += 1
+        self.duration += record.duration
+        self.records.append(record)
+
+
+class QueryCounter(QueryStats):
+    """
+    Counts every statement run anywhere in the process while active
+    (context manager). Used by the query budget fixture in app.testing.
+    """
+
+    def __enter__(self) -> "QueryCounter":
+        global _counters
+        _counters = _counters + (self,)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _counters
+        _counters = tuple(c for c in _counters if c is not self)
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Replaced, never mutated: safe to iterate from other threads
+_counters: Tuple[QueryCounter, ...] = ()
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%s|\$\d+|:\w+)\s*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Statement with literals and IN lists collapsed, to group queries by shape"""
+    statement = _IN_LIST.sub("(...)", statement)
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+def track_queries(scope: Optional[dict] = None) -> QueryStats:
+    """
+    Start counting statements in the current context (one request).
+    The async engine runs statements in greenlets that inherit the
+    caller's context, so the counts land in the request's QueryStats.
+    """
+    stats = QueryStats(scope)
+    _query_stats.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        return
+    duration = time.perf_counter() - context._query_start
+    stats = _query_stats.get()
+    if stats is None and not _counters and duration * 1000 < settings.DB_SLOW_QUERY_MS:
+        return
+
+    rowcount = getattr(cursor, "rowcount", -1)
+    record = QueryRecord(fingerprint(statement), duration, rowcount if rowcount >= 0 else None)
+    if stats is not None:
+        stats.record(record)
+    for counter in _counters:
+        counter.record(record)
+    if settings.DB_SLOW_QUERY_MS and duration * 1000 >= settings.DB_SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "-"
+        rows = "?" if record.rows is None else record.rows
+        logger.warning(f"🐢 Consulta lenta ({duration * 1000:.1f}ms, {rows} linhas) em {route}: {record.fingerprint}")
+
+
+def instrument_queries(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def pool_options(url: str, poolclass) -> Dict[str, Any]:
+    """Engine keyword arguments for the pool settings"""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")):
+        # In-memory SQLite keeps its single-connection pool
+        return options
+    return dict(
+        options,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    echo=settings.DB_ECHO,
+    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    **pool_options(settings.DATABASE_URL, TimedQueuePool)
 )
 
+apply_sqlite_pragmas(engine)
+instrument_queries(engine)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to the matching async driver"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+
+# Async engine used by the API endpoints
+ASYNC_DATABASE_URL = get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.DB_ECHO,
+    **pool_options(ASYNC_DATABASE_URL, TimedAsyncAdaptedQueuePool)
+)
+apply_sqlite_pragmas(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Async engine pool usage, for /health"""
+    pool = async_engine.pool
+    if not isinstance(pool, TimedAsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__}
+    return pool.metrics.stats(pool)
+
+
+async def warm_pool(size: int = settings.DB_POOL_SIZE) -> int:
+    """
+    Open `size` connections at startup and return them to the pool, so the
+    first requests after a deploy don't pay connection setup
+    """
+    if not isinstance(async_engine.pool, TimedAsyncAdaptedQueuePool):
+        return 0
+    connections = await asyncio.gather(*(async_engine.connect() for _ in range(size)), return_exceptions=True)
+    opened = [c for c in connections if not isinstance(c, BaseException)]
+    for connection in opened:
+        await connection.close()
+    failed = [c for c in connections if isinstance(c, BaseException)]
+    if failed:
+        raise failed[0]
+    return len(opened)
+
+
+# Async session factory (objects stay usable after commit, no lazy IO)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
 
 def get_db() -> Generator[Session, None, None]:
     """
-    Dependency to get database session
-    Use in FastAPI endpoints with Depends(get_db)
+    Dependency to get a sync database session
+    Use in scripts and sync code (endpoints use get_async_db)
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session
+    Use in FastAPI endpoints with Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
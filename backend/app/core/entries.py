@@ -0,0 +1,80 @@
+"""
+Entry registration in bulk
+Shared by the gate node sync (POST /gates/entries) and the offline scan
+upload (POST /visitas/validate-qr/batch): many entries, one statement,
+earliest data_entrada wins.
+
+Visitante.total_visitas counts visits entered; it is incremented in the
+same transaction as the entry, only when data_entrada goes from NULL to
+a value (reconcile_visitas.py recomputes it from visitas).
+"""
+from datetime import datetime
+from typing import Dict, Iterable
+from uuid import UUID
+
+from sqlalchemy import bindparam, case, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.visita import Visita, StatusVisita
+from app.models.visitante import Visitante
+
+_NO_SYNC = {"synchronize_session": False, "dml_strategy": "core_only"}
+
+
+async def increment_visit_count(db: AsyncSession, visitante_id: UUID) -> None:
+    """One more visit entered; call in the transaction that registered it"""
+    await db.execute(
+        update(Visitante)
+        .where(Visitante.id == visitante_id)
+        .values(total_visitas=func.coalesce(Visitante.total_visitas, 0) + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _count_first_entries(db: AsyncSession, visita_ids: Iterable[UUID]) -> None:
+    """
+    total_visitas + 1 for each visit not entered yet. Runs before the
+    entry UPDATE; FOR UPDATE makes PostgreSQL wait for, and re-check, a
+    concurrent entry of the same visit (SQLite serializes writers).
+    """
+    first_entry = (
+        select(Visita.visitante_id)
+        .where(Visita.id == bindparam("b_id"), Visita.data_entrada.is_(None))
+        .with_for_update()
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Visitante)
+        .where(Visitante.id == first_entry)
+        .values(total_visitas=func.coalesce(Visitante.total_visitas, 0) + 1)
+        .execution_options(**_NO_SYNC),
+        [{"b_id": visita_id} for visita_id in visita_ids]
+    )
+
+
+async def apply_entries(db: AsyncSession, entries: Dict[UUID, datetime]) -> None:
+    """
+    Set data_entrada for each visit unless it already has an earlier one.
+    The condition runs per row in the database, so a concurrent earlier
+    entry is never overwritten. Does not commit.
+    """
+    if not entries:
+        return
+    await _count_first_entries(db, entries)
+    await db.execute(
+        update(Visita)
+        .where(
+            Visita.id == bindparam("b_id"),
+            or_(Visita.data_entrada.is_(None), Visita.data_entrada > bindparam("b_entrada"))
+        )
+        .values(
+            data_entrada=bindparam("b_entrada"),
+            status=case(
+                (Visita.data_entrada.is_(None), literal(StatusVisita.DENTRO, Visita.status.type)),
+                else_=Visita.status
+            )
+        )
+        # executemany with custom WHERE (not the ORM bulk-by-primary-key path)
+        .execution_options(**_NO_SYNC),
+        [{"b_id": visita_id, "b_entrada": entrada_em} for visita_id, entrada_em in entries.items()]
+    )
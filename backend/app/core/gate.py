@@ -0,0 +1,297 @@
+"""
+Gate node (offline validation)
+With GATE_MODE on, this backend runs next to a gate and validates QR
+Codes against a local SQLite replica of the valid visits instead of the
+central database. Entries are flagged as pending in the replica and a
+background loop pushes them to the central API in batches
+(POST /gates/entries), while the replica is refreshed incrementally
+(GET /gates/replica).
+
+Conflicts: the same visit entered at two gates while offline keeps the
+earliest data_entrada, both centrally and in the replica.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import (
+    create_engine, Boolean, Column, Index, MetaData, Row, Table, and_, case, delete, func, select, update
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.config import settings
+from app.core.database import apply_sqlite_pragmas
+from app.models.visita import Visita, StatusVisita
+
+if TYPE_CHECKING:
+    import httpx  # imported on use: only gate nodes talk to the central API
+
+logger = logging.getLogger(__name__)
+
+GATE_KEY_HEADER = "X-Gate-Key"
+
+# Replica of the columns of Visita needed to validate a scan
+_visitas = Visita.__table__
+replica_metadata = MetaData()
+replica_visitas = Table(
+    "visitas",
+    replica_metadata,
+    Column("id", _visitas.c.id.type, primary_key=True),
+    Column("visitante_id", _visitas.c.visitante_id.type),
+    Column("qr_nonce", _visitas.c.qr_nonce.type),
+    Column("qr_signature", _visitas.c.qr_signature.type),
+    Column("valido_ate", _visitas.c.valido_ate.type),
+    Column("status", _visitas.c.status.type),
+    Column("data_entrada", _visitas.c.data_entrada.type),
+    # Entry registered here and not yet acknowledged by the central API
+    Column("entrada_pendente", Boolean, nullable=False, default=False),
+    Index("ix_replica_qr_nonce_signature", "qr_nonce", "qr_signature"),
+    Index("ix_replica_entrada_pendente", "entrada_pendente"),
+)
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class GateNode:
+    """
+    Local replica + sync loop for one gate.
+    The replica is a local file, so it is queried with the sync driver on
+    the thread pool: one hop per scan instead of one per statement.
+    """
+
+    def __init__(self):
+        self.engine = create_engine(
+            f"sqlite:///{settings.GATE_REPLICA_PATH}",
+            connect_args={"check_same_thread": False}
+        )
+        # Same profile as the main database (WAL: a scan never waits for a full fsync)
+        apply_sqlite_pragmas(self.engine)
+        self._since: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pull_lock = asyncio.Lock()
+        self.last_sync: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.pushed = 0
+        self.conflicts = 0
+
+    # Local validation
+
+    async def register_entry(self, nonce: str, signature: str) -> Optional[Tuple[bool, Row]]:
+        """
+        Same contract as the central conditional UPDATE: (registered now?,
+        row with visitante_id and data_entrada), or None if unknown. A local
+        miss triggers one quick replica pull (the invite may be newer than
+        the last sync) before giving up. If the sync loop is already
+        pulling, the scan waits for that pull, at most GATE_ONLINE_TIMEOUT,
+        instead of queueing behind it for a full GATE_SYNC_TIMEOUT.
+        """
+        result = await run_in_threadpool(self._register_locally, nonce, signature)
+        if result is None:
+            if self._pull_lock.locked():
+                try:
+                    await asyncio.wait_for(self._pull_finished(), settings.GATE_ONLINE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    return None
+            else:
+                await self.pull(timeout=settings.GATE_ONLINE_TIMEOUT)
+            result = await run_in_threadpool(self._register_locally, nonce, signature)
+        return result
+
+    async def _pull_finished(self) -> None:
+        async with self._pull_lock:
+            pass
+
+    def _register_locally(self, nonce: str, signature: str) -> Optional[Tuple[bool, Row]]:
+        match = and_(replica_visitas.c.qr_nonce == nonce, replica_visitas.c.qr_signature == signature)
+        columns = (replica_visitas.c.id, replica_visitas.c.visitante_id, replica_visitas.c.data_entrada)
+        with self.engine.begin() as conn:
+            entrada = conn.execute(
+                update(replica_visitas)
+                .where(match, replica_visitas.c.data_entrada.is_(None))
+                .values(data_entrada=datetime.utcnow(), status=StatusVisita.DENTRO, entrada_pendente=True)
+                .returning(*columns)
+            ).first()
+            if entrada:
+                return True, entrada
+
+            visita = conn.execute(select(*columns).where(match)).first()
+        return None if visita is None else (False, visita)
+
+    # Sync with the central API
+
+    def _client(self, timeout: float) -> "httpx.AsyncClient":
+        import httpx
+        return httpx.AsyncClient(
+            base_url=f"{settings.GATE_CENTRAL_URL.rstrip('/')}/api/v1/gates",
+            headers={GATE_KEY_HEADER: settings.GATE_SYNC_KEY},
+            timeout=timeout
+        )
+
+    async def pull(self, timeout: Optional[float] = None) -> int:
+        """Apply visits changed centrally since the last pull; returns rows applied"""
+        import httpx
+        async with self._pull_lock:
+            try:
+                async with self._client(timeout or settings.GATE_SYNC_TIMEOUT) as client:
+                    params = {"since": self._since} if self._since else {}
+                    response = await client.get("/replica", params=params)
+                    response.raise_for_status()
+                    data = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                self.last_error = f"pull: {e}"
+                return 0
+
+            rows = [
+                {
+                    "id": row["id"],
+                    "visitante_id": row["visitante_id"],
+                    "qr_nonce": row["qr_nonce"],
+                    "qr_signature": row["qr_signature"],
+                    "valido_ate": _parse_datetime(row["valido_ate"]),
+                    "status": StatusVisita(row["status"]),
+                    "data_entrada": _parse_datetime(row["data_entrada"]),
+                }
+                for row in data["visitas"]
+            ]
+            await run_in_threadpool(self._apply_replica, rows)
+            self._since = data["synced_at"]
+            self.last_sync = datetime.utcnow()
+            self.last_error = None
+            return len(rows)
+
+    def _apply_replica(self, rows: List[Dict[str, Any]]) -> None:
+        with self.engine.begin() as conn:
+            if rows:
+                stmt = sqlite_insert(replica_visitas)
+                excluded = stmt.excluded
+                local = replica_visitas.c.data_entrada
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[replica_visitas.c.id],
+                    set_={
+                        "visitante_id": excluded.visitante_id,
+                        "qr_nonce": excluded.qr_nonce,
+                        "qr_signature": excluded.qr_signature,
+                        "valido_ate": excluded.valido_ate,
+                        # A local entry not pushed yet must survive the refresh
+                        "status": case((local.is_(None), excluded.status), else_=replica_visitas.c.status),
+                        "data_entrada": case(
+                            (local.is_(None), excluded.data_entrada),
+                            (excluded.data_entrada.is_(None), local),
+                            else_=func.min(local, excluded.data_entrada)
+                        ),
+                    }
+                ), rows)
+            conn.execute(delete(replica_visitas).where(
+                replica_visitas.c.valido_ate < datetime.utcnow(),
+                replica_visitas.c.entrada_pendente.is_(False)
+            ))
+
+    async def push(self) -> int:
+        """Send pending entries in batches; returns entries acknowledged"""
+        import httpx
+        acknowledged = 0
+        while True:
+            pending = await run_in_threadpool(self._pending_entries)
+            if not pending:
+                return acknowledged
+
+            payload = {
+                "gate_id": settings.GATE_ID,
+                "entries": [
+                    {"visita_id": str(row.id), "entrada_em": row.data_entrada.isoformat()}
+                    for row in pending
+                ],
+            }
+            try:
+                async with self._client(settings.GATE_SYNC_TIMEOUT) as client:
+                    response = await client.post("/entries", json=payload)
+                    response.raise_for_status()
+                    results = response.json()["results"]
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                self.last_error = f"push: {e}"
+                return acknowledged
+
+            await run_in_threadpool(self._acknowledge, pending, results)
+            acknowledged += len(pending)
+            self.pushed += len(pending)
+
+    def _pending_entries(self) -> Sequence[Row]:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(replica_visitas.c.id, replica_visitas.c.data_entrada)
+                .where(replica_visitas.c.entrada_pendente.is_(True))
+                .limit(settings.GATE_SYNC_BATCH)
+            ).all()
+
+    def _acknowledge(self, pending: Sequence[Row], results: List[Dict[str, Any]]) -> None:
+        with self.engine.begin() as conn:
+            for row, result in zip(pending, results):
+                if result["status"] == "conflict":
+                    # Central kept an earlier entry from another gate
+                    self.conflicts += 1
+                    conn.execute(
+                        update(replica_visitas)
+                        .where(replica_visitas.c.id == row.id)
+                        .values(data_entrada=_parse_datetime(result["entrada_em"]))
+                    )
+            conn.execute(
+                update(replica_visitas)
+                .where(replica_visitas.c.id.in_([row.id for row in pending]))
+                .values(entrada_pendente=False)
+            )
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.push()
+                await self.pull()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Gate: erro na sincronização")
+            await asyncio.sleep(settings.GATE_SYNC_INTERVAL)
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        await run_in_threadpool(replica_metadata.create_all, self.engine)
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            # Last chance to deliver entries before shutting down
+            await self.push()
+        self.engine.dispose()
+
+    def _counts(self) -> Tuple[int, int]:
+        with self.engine.connect() as conn:
+            replica = conn.scalar(select(func.count()).select_from(replica_visitas))
+            pending = conn.scalar(
+                select(func.count()).select_from(replica_visitas).where(replica_visitas.c.entrada_pendente.is_(True))
+            )
+        return replica, pending
+
+    async def stats(self) -> Dict[str, Any]:
+        replica, pending = await run_in_threadpool(self._counts)
+        return {
+            "gate_id": settings.GATE_ID,
+            "replica_visitas": replica,
+            "pending_entries": pending,
+            "pushed": self.pushed,
+            "conflicts": self.conflicts,
+            "last_sync": self.last_sync.isoformat() if self.last_sync else None,
+            "last_error": self.last_error,
+        }
+
+
+gate_node = GateNode() if settings.GATE_MODE else None
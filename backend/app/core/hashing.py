@@ -0,0 +1,97 @@
+"""
+Password hashing executor
+Bounded thread pool that keeps bcrypt off the event loop
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.profiler import bind_request
+
+
+class HashingQueueFull(Exception):
+    """Raised when the hashing executor has no room for another job"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is saturated")
+        self.retry_after = retry_after
+
+
+class BoundedHashingExecutor:
+    """
+    Thread pool with a hard limit on pending jobs.
+    bcrypt releases the GIL, so threads give real parallelism here.
+    Jobs beyond max_workers + max_queue are rejected instead of queued.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool, raising HashingQueueFull when saturated"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HashingQueueFull(self.retry_after)
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(bind_request(func), *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        # Released from the worker thread, so a cancelled request
+        # still holds its slot until bcrypt actually finishes
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth metrics"""
+        with self._lock:
+            pending = self._pending
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(pending, self.max_workers),
+                "queued": max(pending - self.max_workers, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_executor = BoundedHashingExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER
+)
@@ -0,0 +1,114 @@
+"""
+Prometheus metrics (GET /metrics)
+Per-route latency histograms, requests in flight, statements and DB time
+per request, connection pool checkout waits and usage, and QR validations
+by result (rate() gives validations/s).
+
+With several workers set PROMETHEUS_MULTIPROC_DIR: each process writes
+its samples to its own mmap'd files in that directory (no locking across
+processes) and /metrics aggregates them. See gunicorn.conf.py.
+"""
+import os
+
+from app.core.config import settings
+
+# prometheus_client picks its value backend at import time
+if settings.PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.PROMETHEUS_MULTIPROC_DIR)
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from starlette.requests import Request
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    # app.core.database feeds the pool metrics below, so no runtime import back
+    from app.core.database import QueryStats
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "portaria_http_request_duration_seconds",
+    "Request latency by route template and status",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "portaria_http_requests_in_progress",
+    "Requests being handled",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Histogram(
+    "portaria_db_queries_per_request",
+    "SQL statements executed per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_TIME = Histogram(
+    "portaria_db_time_per_request_seconds",
+    "Time spent in SQL statements per request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_POOL_WAIT = Histogram(
+    "portaria_db_pool_checkout_wait_seconds",
+    "Time waiting for a connection from the pool",
+    ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_IN_USE = Gauge(
+    "portaria_db_pool_connections_in_use",
+    "Connections checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "portaria_db_pool_overflow_connections",
+    "Connections open beyond DB_POOL_SIZE",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+QR_VALIDATIONS = Counter(
+    "portaria_qr_validations_total",
+    "QR Code validations by result (success, already_used, forged, expired, invalid, not_found)",
+    ["result"],
+)
+WRITE_BEHIND_FLUSH = Histogram(
+    "portaria_write_behind_flush_seconds",
+    "Duration of write-behind flushes (one transaction each)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+WRITE_BEHIND_BACKLOG = Gauge(
+    "portaria_write_behind_backlog",
+    "Buffered row updates waiting for the next flush",
+    multiprocess_mode="livesum",
+)
+WRITE_BEHIND_ROWS = Counter(
+    "portaria_write_behind_rows_total",
+    "Row updates written by write-behind flushes",
+)
+
+
+def route_label(request: Request) -> str:
+    """Route template (/api/v1/visitas/{visita_id}/saida), never the raw path"""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def observe_request(request: Request, status_code: int, seconds: float, queries: "QueryStats") -> None:
+    route = route_label(request)
+    REQUEST_LATENCY.labels(request.method, route, str(status_code)).observe(seconds)
+    DB_QUERIES.labels(route).observe(queries.count)
+    DB_TIME.labels(route).observe(queries.duration)
+
+
+def count_qr_validation(result: str) -> None:
+    QR_VALIDATIONS.labels(result).inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
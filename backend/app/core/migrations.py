@@ -0,0 +1,86 @@
+"""
+Schema migrations (Alembic) for startup and deploys
+A normal boot costs one query: the revision in alembic_version is compared
+with the head of alembic/versions. Only a stale database pays for Alembic
+itself. Databases created by create_all before migrations existed have
+every table but no alembic_version; they are stamped at 0001 (the schema
+create_all produced) and upgraded from there.
+"""
+import logging
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+INITIAL_REVISION = "0001"
+LEGACY_TABLE = "usuarios"  # present in every database create_all built
+
+logger = logging.getLogger(__name__)
+
+
+def alembic_config(connection: Optional[Connection] = None):
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    # Keep the application's logging setup
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """Revision the database is at; None when it was never migrated"""
+    with engine.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except DBAPIError:
+            return None
+
+
+def migrate(engine: Engine) -> Optional[str]:
+    """Upgrade to head; returns the revision the database was at"""
+    from alembic import command
+
+    current = current_revision(engine)
+    if current == head_revision():
+        return current
+
+    with engine.begin() as connection:
+        config = alembic_config(connection)
+        if current is None and inspect(connection).has_table(LEGACY_TABLE):
+            logger.info(f"🗄️ Banco criado sem migrações: marcando revisão {INITIAL_REVISION}")
+            command.stamp(config, INITIAL_REVISION)
+        command.upgrade(config, "head")
+    logger.info(f"✅ Schema migrado: {current or 'vazio'} -> {head_revision()}")
+    return current
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool = True) -> bool:
+    """Startup check; True when the schema is at head (after migrating, if allowed)"""
+    current = current_revision(engine)
+    head = head_revision()
+    if current == head:
+        return True
+    if not auto_migrate:
+        logger.error(f"❌ Schema na revisão {current or 'vazia'}, esperado {head}: execute python init_db.py")
+        return False
+    migrate(engine)
+    return True
+
+
+if __name__ == "__main__":
+    from app.core.database import engine
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    migrate(engine)
@@ -0,0 +1,134 @@
+"""
+Consumed QR nonce cache
+Lets validate-qr answer repeat scans without touching the database.
+The database stays authoritative: a miss here just falls through to the
+conditional UPDATE, so eviction or a Redis outage never admits a replay.
+"""
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.visita import Visita
+
+logger = logging.getLogger(__name__)
+
+
+def _expiry_timestamp(valido_ate: datetime) -> float:
+    """valido_ate is naive UTC (datetime.utcnow) throughout the app"""
+    return (valido_ate - datetime(1970, 1, 1)).total_seconds()
+
+
+class MemoryNonceStore:
+    """
+    Bounded in-process map nonce -> entry time, each kept until the QR
+    Code's valido_ate. Oldest entries are evicted first when full.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, nonce: str) -> Optional[str]:
+        entry = self._data.get(nonce)
+        if entry is None or entry[0] < time.time():
+            if entry is not None:
+                del self._data[nonce]
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    async def add(self, nonce: str, entrada_em: datetime, valido_ate: datetime) -> None:
+        expires_at = _expiry_timestamp(valido_ate)
+        if expires_at < time.time():
+            return
+        self._data[nonce] = (expires_at, entrada_em.isoformat())
+        self._data.move_to_end(nonce)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def close(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"backend": "memory", "entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class RedisNonceStore:
+    """Shared across workers and gates; keys expire at valido_ate"""
+
+    KEY_PREFIX = "portaria:qr-nonce:"
+
+    def __init__(self, url: str):
+        # Optional dependency, only imported when the backend is selected
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, nonce: str) -> Optional[str]:
+        try:
+            value = await self._redis.get(self.KEY_PREFIX + nonce)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Nonce cache: Redis indisponível: {e}")
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def add(self, nonce: str, entrada_em: datetime, valido_ate: datetime) -> None:
+        expires_at = int(_expiry_timestamp(valido_ate))
+        if expires_at <= time.time():
+            return
+        try:
+            await self._redis.set(self.KEY_PREFIX + nonce, entrada_em.isoformat(), exat=expires_at)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Nonce cache: Redis indisponível: {e}")
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def create_nonce_store():
+    if settings.NONCE_CACHE_BACKEND == "redis":
+        return RedisNonceStore(settings.REDIS_URL)
+    return MemoryNonceStore(settings.NONCE_CACHE_MAX_ENTRIES)
+
+
+nonce_store = create_nonce_store()
+
+
+async def warm_nonce_store(db: AsyncSession) -> int:
+    """Load nonces of QR Codes already used that are still within valido_ate"""
+    rows = await db.execute(
+        select(Visita.qr_nonce, Visita.data_entrada, Visita.valido_ate)
+        .where(
+            Visita.data_entrada.is_not(None),
+            Visita.qr_nonce.is_not(None),
+            Visita.valido_ate > datetime.utcnow()
+        )
+        .order_by(Visita.data_entrada.desc())
+        .limit(settings.NONCE_CACHE_MAX_ENTRIES)
+    )
+    count = 0
+    for nonce, data_entrada, valido_ate in rows:
+        await nonce_store.add(nonce, data_entrada, valido_ate)
+        count += 1
+    return count
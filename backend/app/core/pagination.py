@@ -0,0 +1,75 @@
+"""
+Keyset (cursor) pagination
+Seeks past the last (sort value, id) seen instead of OFFSET scanning
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, or_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """Opaque cursor for the row after which the next page starts"""
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Cursor de paginação inválido")
+
+
+def paginate(
+    stmt: Select,
+    sort_column,
+    id_column,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: Optional[int] = None,
+    descending: bool = True
+) -> Select:
+    """
+    Order stmt by (sort_column, id_column) and fetch one row more than
+    limit so page_items() can tell whether a next page exists.
+    skip keeps the legacy OFFSET mode for old clients.
+    """
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+
+    if skip is not None:
+        return stmt.offset(skip).limit(limit + 1)
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if descending:
+            seek = or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < last_id))
+        else:
+            seek = or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id))
+        stmt = stmt.where(seek)
+
+    return stmt.limit(limit + 1)
+
+
+def page_items(rows: Sequence[Any], limit: int, sort_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """Split the limit + 1 rows into (page, next_cursor)"""
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(getattr(last, sort_attr), last.id)
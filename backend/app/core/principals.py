@@ -0,0 +1,93 @@
+"""
+Authenticated user principals
+Short-TTL cache of the user fields authorization needs, so an authenticated
+request costs no query while its entry is fresh. Commits that change a
+user's role or active flag (or delete it) drop its entry, and the claims
+cached for its tokens, in this worker; other workers pick the change up
+within PRINCIPAL_CACHE_TTL.
+"""
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import AsyncTTLCache
+from app.core.config import settings
+from app.core.security import token_cache
+from app.models.user import User
+
+# Changing any of these must take effect before the entry expires
+_WATCHED_FIELDS = ("role", "is_active")
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: UUID
+    email: str
+    nome: str
+    role: str
+    is_active: bool
+
+
+principal_cache = AsyncTTLCache(ttl=settings.PRINCIPAL_CACHE_TTL, max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+async def load_principal(db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+    async def load() -> Optional[Principal]:
+        row = (await db.execute(
+            select(User.id, User.email, User.nome, User.role, User.is_active).where(User.id == user_id)
+        )).first()
+        if row is None:
+            return None
+        return Principal(
+            id=row.id, email=row.email, nome=row.nome, role=row.role.value, is_active=bool(row.is_active)
+        )
+
+    return await principal_cache.get_or_load(user_id, load)
+
+
+def invalidate_principal(user_id: Optional[UUID] = None) -> None:
+    """Drop one user's cached principal and token claims (or everyone's)"""
+    principal_cache.invalidate(user_id)
+    token_cache.forget(None if user_id is None else str(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_principal_changes(session, flush_context):
+    """Collect users whose role or active flag changed, or that were deleted"""
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            session.info.setdefault("principals_dirty", set()).add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in _WATCHED_FIELDS):
+                session.info.setdefault("principals_dirty", set()).add(obj.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_principal_bulk_changes(orm_execute_state):
+    """ORM-enabled UPDATE/DELETE on users: rows unknown, drop every entry"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(issubclass(mapper.class_, User) for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info["principals_dirty_all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals(session):
+    if session.info.pop("principals_dirty_all", False):
+        session.info.pop("principals_dirty", None)
+        invalidate_principal()
+        return
+    for user_id in session.info.pop("principals_dirty", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session):
+    session.info.pop("principals_dirty", None)
+    session.info.pop("principals_dirty_all", None)
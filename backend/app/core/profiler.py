@@ -0,0 +1,210 @@
+"""
+Sampling profiler (POST /api/v1/admin/profile)
+While a session is active, a SIGPROF interval timer fires every few ms of
+process CPU time. Each tick records the Python stack of every thread,
+weighted by the CPU time that thread used since the previous tick, so
+waiting threads (idle event loop, pool workers) weigh ~nothing. The
+event loop thread is sampled from the signal frame itself: unbiased,
+unlike a sampler thread, which only ever gets the GIL when the loop
+releases it in select().
+
+Output: collapsed stacks ("thread;module:func;... weight", weight in CPU
+microseconds; the input of flamegraph.pl and speedscope) plus CPU time
+per route. The request middleware puts the ASGI scope in a ContextVar;
+the handler runs in the context of the task it interrupted, so event
+loop samples are charged to that request's route (middleware,
+dependencies and serialization included). Thread pool jobs wrapped with
+bind_request() register their request per thread while they run. Work of
+no request (idle loop, background tasks) is totalled per thread group,
+as "(MainThread)". Nothing runs between sessions. Unix only; covers the
+worker process that served the request.
+
+The signal handler only reads sys._current_frames() and per-thread CPU
+clocks. threading.enumerate() takes a non-reentrant lock that the main
+thread also holds while starting or reaping threads, so thread names
+are resolved outside the handler, in start() and stop().
+"""
+import functools
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, MutableMapping, Optional
+
+_THREAD_SUFFIX = re.compile(r"[_-]\d+$")
+_ANONYMOUS_THREAD = re.compile(r"^Thread-\d+ \((.*)\)$")
+
+SUPPORTED = hasattr(signal, "setitimer") and hasattr(time, "pthread_getcpuclockid")
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is already running"""
+
+
+class ProfilerUnavailable(Exception):
+    """Raised when the SIGPROF handler cannot be installed (app not on the main thread)"""
+
+
+def _frame_label(code: CodeType) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def thread_group(name: str) -> str:
+    """password-hash_3 -> password-hash, Thread-5 (worker) -> worker"""
+    return _THREAD_SUFFIX.sub("", _ANONYMOUS_THREAD.sub(r"\1", name))
+
+
+# ASGI scope of the request being served (set by the request middleware)
+request_scope: ContextVar[Optional[MutableMapping[str, Any]]] = ContextVar("profiler_request_scope", default=None)
+
+# Thread ident -> scope of the request whose thread pool job it is running
+_thread_scopes: Dict[int, MutableMapping[str, Any]] = {}
+
+
+def bind_request(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap func, about to run on a thread pool, so its CPU counts for the current request"""
+    scope = request_scope.get()
+    if scope is None:
+        return func
+
+    @functools.wraps(func)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        ident = threading.get_ident()
+        _thread_scopes[ident] = scope
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _thread_scopes.pop(ident, None)
+
+    return run
+
+
+def _route_of(scope: Optional[MutableMapping[str, Any]]) -> Optional[str]:
+    """Route template once routed (scope["route"]), "(routing)" before"""
+    if scope is None:
+        return None
+    return getattr(scope.get("route"), "path", "(routing)")
+
+
+class SamplingProfiler:
+    """One session at a time; start() and stop() run on the main thread"""
+
+    def __init__(self):
+        self.active = False
+        self._labels: Dict[CodeType, str] = {}
+        self._stacks: Counter = Counter()  # (thread ident, stack) -> CPU us
+        self._route_cpu: Counter = Counter()  # route, or thread ident outside any route -> CPU us
+        self._cpu_seen: Dict[int, float] = {}
+        self._names: Dict[int, str] = {}
+        self._main = 0
+        self._ticks = 0
+        self._started = 0.0
+        self._previous_handler = None
+
+    def start(self, interval: float) -> None:
+        if self.active:
+            raise ProfilerBusy("Já existe uma sessão de profiling em andamento")
+        self._stacks.clear()
+        self._route_cpu.clear()
+        self._cpu_seen = {ident: self._thread_cpu(ident) or 0.0 for ident in sys._current_frames()}
+        self._names = self._thread_names()
+        self._main = threading.main_thread().ident
+        self._ticks = 0
+        self._started = time.perf_counter()
+        try:
+            # Only the main thread may install signal handlers (not the case under TestClient)
+            self._previous_handler = signal.signal(signal.SIGPROF, self._tick)
+        except ValueError as e:
+            raise ProfilerUnavailable(f"Profiler indisponível: {e}") from e
+        try:
+            signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        except (OSError, ValueError) as e:
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+            raise ProfilerUnavailable(f"Profiler indisponível: {e}") from e
+        self.active = True
+
+    def stop(self) -> Dict[str, Any]:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self.active = False
+
+        # Threads alive at start or stop; ones that came and went keep their ident
+        names = {**self._names, **self._thread_names()}
+
+        def name_of(ident: int) -> str:
+            return names.get(ident, f"thread-{ident}")
+
+        stacks: Counter = Counter()
+        for (ident, stack), cpu in self._stacks.items():
+            stacks[f"{name_of(ident)};{stack}"] += cpu
+        routes: Counter = Counter()
+        for route, cpu in self._route_cpu.items():
+            routes[route if isinstance(route, str) else f"({thread_group(name_of(route))})"] += cpu
+
+        cpu_total = sum(routes.values())
+        return {
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "ticks": self._ticks,
+            "cpu_ms": round(cpu_total / 1000, 1),
+            "routes": {
+                route: {"cpu_ms": round(cpu / 1000, 1), "percent": round(cpu * 100 / cpu_total, 1)}
+                for route, cpu in routes.most_common()
+            },
+            "collapsed": "\n".join(f"{stack} {cpu}" for stack, cpu in stacks.most_common() if cpu),
+        }
+
+    @staticmethod
+    def _thread_names() -> Dict[int, str]:
+        """Never from the signal handler (see module docstring)"""
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    @staticmethod
+    def _thread_cpu(ident: int) -> Optional[float]:
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, OverflowError):
+            return None  # thread gone
+
+    def _tick(self, signum: int, frame: Optional[FrameType]) -> None:
+        self._ticks += 1
+        frames = sys._current_frames()
+        if frame is not None:
+            # The main thread's entry in _current_frames is this handler
+            frames[self._main] = frame
+        # Running in the interrupted task's context: its request, if any
+        main_route = _route_of(request_scope.get())
+
+        for ident, thread_frame in frames.items():
+            cpu = self._thread_cpu(ident)
+            if cpu is None:
+                continue
+            used = int((cpu - self._cpu_seen.get(ident, cpu)) * 1_000_000)
+            self._cpu_seen[ident] = cpu
+            if used <= 0:
+                continue
+            stack = self._walk(thread_frame)
+            stack.reverse()
+            self._stacks[(ident, ";".join(stack))] += used
+            route = main_route if ident == self._main else _route_of(_thread_scopes.get(ident))
+            self._route_cpu[route or ident] += used
+
+    def _walk(self, frame: Optional[FrameType]) -> list:
+        """Innermost-first frame labels"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        return stack
+
+
+profiler = SamplingProfiler()
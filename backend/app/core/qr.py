@@ -0,0 +1,125 @@
+"""
+QR Code rendering with a two-tier image cache
+segno (pure Python, no PIL) renders PNG/SVG; memory LRU in front of an
+optional on-disk tier under STORAGE_PATH
+"""
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.profiler import bind_request
+
+logger = logging.getLogger(__name__)
+
+
+# Error correction: H (~30% of the modules recoverable), for worn prints
+# and cracked phone screens. Part of the image cache key and ETag.
+QR_ERROR_LEVEL = "h"
+
+# Image kinds served by /visitas/{id}/qrcode
+QR_MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def negotiate_qr_format(accept: str) -> str:
+    """
+    Pick png, svg or json from an Accept header (highest q wins,
+    header order breaks ties). JSON stays the default for API clients.
+    """
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        media, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        candidates.append((-quality, position, media.strip().lower()))
+
+    for neg_quality, _, media in sorted(candidates):
+        if neg_quality >= 0:
+            break
+        if media == "image/svg+xml":
+            return "svg"
+        if media in ("image/png", "image/*"):
+            return "png"
+        if media in ("application/json", "*/*"):
+            return "json"
+    return "json"
+
+
+def render_qr(payload: str, kind: str = "png") -> bytes:
+    """Encode payload as a QR Code image (kind: png or svg) at QR_ERROR_LEVEL"""
+    import segno  # only this endpoint needs it; kept out of worker boot
+    qr = segno.make(payload, error=QR_ERROR_LEVEL, micro=False)
+    buffer = io.BytesIO()
+    qr.save(buffer, kind=kind, scale=10, border=4)
+    return buffer.getvalue()
+
+
+class QRImageCache:
+    """
+    Rendered QR images keyed on (visit id, signature).
+    The payload of a visit never changes after creation, so entries are
+    never invalidated, only evicted.
+    """
+
+    def __init__(self, max_entries: int, disk_dir: Optional[Path] = None):
+        self.memory = LRUCache(max_entries)
+        self.disk_dir = disk_dir
+        self.disk_hits = 0
+        self.renders = 0
+
+    def _load_or_render(self, key: str, payload: str, kind: str) -> bytes:
+        if self.disk_dir is not None:
+            path = self.disk_dir / f"{key}.{kind}"
+            try:
+                data = path.read_bytes()
+                self.disk_hits += 1
+                return data
+            except FileNotFoundError:
+                pass
+
+        data = render_qr(payload, kind)
+        self.renders += 1
+
+        if self.disk_dir is not None:
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                # Atomic write: concurrent workers never see a partial file
+                fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning(f"QR cache: falha ao gravar em disco: {e}")
+        return data
+
+    async def get_image(self, key: str, payload: str, kind: str = "png") -> bytes:
+        data = self.memory.get((key, kind))
+        if data is None:
+            # Disk IO and encoding stay off the event loop
+            data = await run_in_threadpool(bind_request(self._load_or_render), key, payload, kind)
+            self.memory.put((key, kind), data)
+        return data
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "disk_hits": self.disk_hits, "renders": self.renders}
+
+
+qr_image_cache = QRImageCache(
+    max_entries=settings.QR_CACHE_MAX_ENTRIES,
+    disk_dir=Path(settings.STORAGE_PATH) / "qrcodes" if settings.QR_CACHE_DISK else None
+)
@@ -0,0 +1,131 @@
+"""
+Compact QR Code payload
+Binary, versioned layout encoded in base45 so the whole token uses the
+QR alphanumeric mode and fits a low QR version:
+
+    "PT:" + base45(version | key id | visitor uuid | unit uuid |
+                   expiry epoch seconds | nonce | truncated HMAC)
+
+Legacy JSON payloads ({"visitor_id": ..., "signature": ...}) are still
+accepted by validate-qr; see app.core.security.
+"""
+import struct
+import uuid
+from datetime import datetime
+from typing import NamedTuple, Union
+
+QR_PREFIX = "PT:"
+QR_FORMAT_VERSION = 1
+QR_NONCE_SIZE = 8
+QR_MAC_SIZE = 10  # 80-bit truncated HMAC-SHA256
+
+# version, key id, visitor id, unit id, expiry (uint32 epoch seconds), nonce
+_BODY = struct.Struct(f">BB16s16sI{QR_NONCE_SIZE}s")
+
+_BASE45 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_INDEX = {c: i for i, c in enumerate(_BASE45)}
+_EPOCH = datetime(1970, 1, 1)
+
+
+class InvalidQRPayload(ValueError):
+    """Raised when a compact QR token is malformed"""
+
+
+class CompactQR(NamedTuple):
+    version: int
+    key_id: int
+    visitor_id: uuid.UUID
+    unit_id: uuid.UUID
+    valid_until: datetime
+    nonce: str  # hex, as stored in visitas.qr_nonce
+    signature: str  # hex, as stored in visitas.qr_signature
+    body: bytes  # signed bytes
+
+
+def b45encode(data: bytes) -> str:
+    """RFC 9285 base45"""
+    out = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] * 256 + data[i + 1]
+        n, c = divmod(n, 45)
+        e, d = divmod(n, 45)
+        out += [_BASE45[c], _BASE45[d], _BASE45[e]]
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out += [_BASE45[c], _BASE45[d]]
+    return "".join(out)
+
+
+def b45decode(text: str) -> bytes:
+    try:
+        values = [_BASE45_INDEX[c] for c in text]
+    except KeyError:
+        raise InvalidQRPayload("Caractere inválido no QR Code")
+    if len(values) % 3 == 1:
+        raise InvalidQRPayload("Tamanho inválido no QR Code")
+    out = bytearray()
+    for i in range(0, len(values), 3):
+        chunk = values[i:i + 3]
+        n = sum(v * 45 ** k for k, v in enumerate(chunk))
+        if len(chunk) == 3:
+            if n > 0xFFFF:
+                raise InvalidQRPayload("Bloco inválido no QR Code")
+            out += n.to_bytes(2, "big")
+        else:
+            if n > 0xFF:
+                raise InvalidQRPayload("Bloco inválido no QR Code")
+            out.append(n)
+    return bytes(out)
+
+
+def pack_qr_body(
+    visitor_id: Union[str, uuid.UUID],
+    unit_id: Union[str, uuid.UUID],
+    valid_until: datetime,
+    nonce: bytes,
+    key_id: int = 0
+) -> bytes:
+    """Bytes covered by the signature (valid_until is naive UTC)"""
+    expiry = int((valid_until - _EPOCH).total_seconds())
+    return _BODY.pack(
+        QR_FORMAT_VERSION,
+        key_id,
+        uuid.UUID(str(visitor_id)).bytes,
+        uuid.UUID(str(unit_id)).bytes,
+        expiry,
+        nonce
+    )
+
+
+def qr_body_key_id(body: bytes) -> int:
+    """Key id byte of a packed body (selects the signing key)"""
+    return body[1] if len(body) > 1 else -1
+
+
+def encode_compact_qr(body: bytes, signature: str) -> str:
+    return QR_PREFIX + b45encode(body + bytes.fromhex(signature))
+
+
+def is_compact_qr(text: str) -> bool:
+    return isinstance(text, str) and text.startswith(QR_PREFIX)
+
+
+def decode_compact_qr(text: str) -> CompactQR:
+    """Parse a token (signature is NOT checked here)"""
+    if not is_compact_qr(text):
+        raise InvalidQRPayload("Formato de QR Code desconhecido")
+    raw = b45decode(text[len(QR_PREFIX):])
+    if len(raw) != _BODY.size + QR_MAC_SIZE or raw[0] != QR_FORMAT_VERSION:
+        raise InvalidQRPayload("Versão ou tamanho de QR Code não suportado")
+    body, mac = raw[:_BODY.size], raw[_BODY.size:]
+    version, key_id, visitor, unit, expiry, nonce = _BODY.unpack(body)
+    return CompactQR(
+        version=version,
+        key_id=key_id,
+        visitor_id=uuid.UUID(bytes=visitor),
+        unit_id=uuid.UUID(bytes=unit),
+        valid_until=datetime.utcfromtimestamp(expiry),
+        nonce=nonce.hex(),
+        signature=mac.hex(),
+        body=body
+    )
@@ -0,0 +1,116 @@
+"""
+Refresh token rotation state
+Every refresh token carries a random id (jti) and the id of its login
+session (fam). POST /auth/refresh accepts each jti once and issues a new
+token in the same family. A jti presented twice means the token leaked:
+the whole family is revoked and its holder has to log in again.
+
+Only used jtis and revoked families are stored, each until the last
+moment a token it covers could still be valid, so the store stays small.
+The memory backend is per worker; with several workers use Redis, whose
+SET NX makes "use once" atomic across them.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStoreUnavailable(Exception):
+    """Raised when the shared store cannot be reached"""
+
+
+class MemoryRevocationStore:
+    """
+    Bounded in-process map key -> expiry. Keys are inserted with roughly
+    increasing expiries (now + REFRESH_TOKEN_EXPIRE_DAYS), so expired ones
+    are trimmed from the front; when full the oldest go first.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, float]" = OrderedDict()
+        self.reuses = 0
+
+    def _trim(self) -> None:
+        now = time.time()
+        while self._data and (len(self._data) > self.max_entries or next(iter(self._data.values())) < now):
+            self._data.popitem(last=False)
+
+    async def consume(self, jti: str, expires_at: float) -> bool:
+        """Record a refresh token as used; False if it already was"""
+        key = f"jti:{jti}"
+        if self._data.get(key, 0) >= time.time():
+            self.reuses += 1
+            return False
+        self._data[key] = expires_at
+        self._data.move_to_end(key)
+        self._trim()
+        return True
+
+    async def revoke_family(self, family: str, until: float) -> None:
+        self._data[f"fam:{family}"] = until
+        self._data.move_to_end(f"fam:{family}")
+        self._trim()
+
+    async def is_revoked(self, family: str) -> bool:
+        return self._data.get(f"fam:{family}", 0) >= time.time()
+
+    async def close(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"backend": "memory", "entries": len(self._data), "reuses": self.reuses}
+
+
+class RedisRevocationStore:
+    """Shared across workers; keys expire with the tokens they cover"""
+
+    KEY_PREFIX = "portaria:refresh:"
+
+    def __init__(self, url: str):
+        # Optional dependency, only imported when the backend is selected
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self.reuses = 0
+        self.errors = 0
+
+    async def _call(self, method: str, *args, **kwargs):
+        try:
+            return await getattr(self._redis, method)(*args, **kwargs)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Refresh tokens: Redis indisponível: {e}")
+            raise RevocationStoreUnavailable(str(e)) from e
+
+    async def consume(self, jti: str, expires_at: float) -> bool:
+        first_use = await self._call("set", f"{self.KEY_PREFIX}jti:{jti}", 1, nx=True, exat=int(expires_at) + 1)
+        if not first_use:
+            self.reuses += 1
+        return bool(first_use)
+
+    async def revoke_family(self, family: str, until: float) -> None:
+        await self._call("set", f"{self.KEY_PREFIX}fam:{family}", 1, exat=int(until) + 1)
+
+    async def is_revoked(self, family: str) -> bool:
+        return bool(await self._call("exists", f"{self.KEY_PREFIX}fam:{family}"))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {"backend": "redis", "reuses": self.reuses, "errors": self.errors}
+
+
+def create_revocation_store():
+    if settings.REFRESH_STORE_BACKEND == "redis":
+        return RedisRevocationStore(settings.REDIS_URL)
+    return MemoryRevocationStore(settings.REFRESH_STORE_MAX_ENTRIES)
+
+
+revocation_store = create_revocation_store()
@@ -3,22 +3,17 @@ Security utilities
 JWT tokens, password hashing, QR Code signing
 """
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 import hashlib
+import hmac
 import secrets
-import pyotp
+import time
 
+from app.core.cache import LRUCache
 from app.core.config import settings
-
-# Password hashing - Use bcrypt with explicit rounds
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12,
-    bcrypt__ident="2b"
-)
+from app.core.hashing import hashing_executor
+from app.core.qr_payload import QR_MAC_SIZE, qr_body_key_id
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -59,6 +54,16 @@ def get_password_hash(password: str) -> str:
         raise
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing executor (raises HashingQueueFull)"""
+    return await hashing_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing executor (raises HashingQueueFull)"""
+    return await hashing_executor.run(get_password_hash, password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -73,11 +78,16 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
-def create_refresh_token(data: Dict[str, Any]) -> str:
-    """Create JWT refresh token"""
+def create_refresh_token(data: Dict[str, Any], family: Optional[str] = None) -> str:
+    """Create JWT refresh token (single use: new jti; family = login session, kept on rotation)"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({
+        "exp": expire,
+        "type": "refresh",
+        "jti": secrets.token_urlsafe(16),
+        "fam": family or secrets.token_urlsafe(16),
+    })
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -91,11 +101,111 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def sign_qr_code_data(data: Dict[str, Any], nonce: Optional[str] = None) -> str:
+class VerifiedTokenCache:
+    """
+    Claims of tokens whose signature and expiry were already checked, keyed
+    on the SHA-256 of the token and dropped once `exp` passes. Failed
+    decodes are not cached. Callers must not mutate the returned claims.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._claims = LRUCache(max_entries)
+
+    def claims(self, token: str) -> Optional[Dict[str, Any]]:
+        if not self.max_entries:
+            return decode_token(token)
+        digest = hashlib.sha256(token.encode()).digest()
+        payload = self._claims.get(digest)
+        if payload is not None:
+            if payload.get("exp", 0) > time.time():
+                return payload
+            self._claims.pop(digest)
+        payload = decode_token(token)
+        if payload is not None:
+            self._claims.put(digest, payload)
+        return payload
+
+    def forget(self, subject: Optional[str] = None) -> int:
+        """Drop the claims cached for one subject (or all)"""
+        if subject is None:
+            dropped = len(self._claims)
+            self._claims.clear()
+            return dropped
+        return self._claims.discard_if(lambda payload: payload.get("sub") == subject)
+
+    def stats(self) -> Dict[str, int]:
+        return self._claims.stats()
+
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
+class QRSigner:
+    """
+    HMAC-SHA256 signer for compact QR Codes.
+    One keyed hmac object per key id, built once; every call copies it
+    instead of re-keying. The key id travels in the payload, so codes signed with a previous
+    key stay valid after rotation.
+    """
+
+    def __init__(self, keys: Dict[int, str], active_key_id: int):
+        if active_key_id not in keys:
+            raise ValueError(f"QR key id {active_key_id} has no secret")
+        self.active_key_id = active_key_id
+        self._keyed = {
+            key_id: hmac.new(secret.encode(), digestmod=hashlib.sha256) for key_id, secret in keys.items()
+        }
+
+    def _mac(self, body: bytes) -> Optional[bytes]:
+        keyed = self._keyed.get(qr_body_key_id(body))
+        if keyed is None:
+            return None
+        mac = keyed.copy()
+        mac.update(body)
+        return mac.digest()[:QR_MAC_SIZE]
+
+    def sign(self, body: bytes) -> str:
+        mac = self._mac(body)
+        if mac is None:
+            raise ValueError("QR key id desconhecido")
+        return mac.hex()
+
+    def verify(self, body: bytes, signature: str) -> bool:
+        mac = self._mac(body)
+        try:
+            expected = bytes.fromhex(signature)
+        except (TypeError, ValueError):
+            return False
+        return mac is not None and hmac.compare_digest(mac, expected)
+
+    def verify_many(self, items: Iterable[Tuple[bytes, str]]) -> List[bool]:
+        """Verify (body, signature) pairs in one call"""
+        return [self.verify(body, signature) for body, signature in items]
+
+
+def _qr_keys() -> Dict[int, str]:
+    """Active key plus QR_PREVIOUS_KEYS ("id:secret,id:secret") kept for verification"""
+    keys = {}
+    for item in filter(None, (part.strip() for part in settings.QR_PREVIOUS_KEYS.split(","))):
+        key_id, _, secret = item.partition(":")
+        keys[int(key_id)] = secret
+    keys[settings.QR_KEY_ID] = settings.QR_SECRET_KEY
+    return keys
+
+
+qr_signer = QRSigner(_qr_keys(), settings.QR_KEY_ID)
+
+
+def sign_qr_code_data(data: Union[Dict[str, Any], bytes], nonce: Optional[str] = None) -> str:
     """
     Generate cryptographic signature for QR Code
-    Uses SHA-256 with secret key + nonce for anti-fraud
+    bytes: compact payload body (app.core.qr_payload), truncated HMAC-SHA256
+    dict: legacy JSON payload, SHA-256 with secret key + nonce
     """
+    if isinstance(data, (bytes, bytearray)):
+        return qr_signer.sign(data)
+    
     if nonce is None:
         nonce = secrets.token_urlsafe(16)
     
@@ -109,22 +219,37 @@ def sign_qr_code_data(data: Dict[str, Any], nonce: Optional[str] = None) -> str:
     return signature
 
 
-def verify_qr_code_signature(data: Dict[str, Any], signature: str, nonce: str) -> bool:
+def verify_qr_code_signature(
+    data: Union[Dict[str, Any], bytes],
+    signature: str,
+    nonce: Optional[str] = None
+) -> bool:
     """
-    Verify QR Code signature
+    Verify QR Code signature (compact body or legacy dict + nonce)
     Returns True if signature is valid
     """
+    if isinstance(data, (bytes, bytearray)):
+        return qr_signer.verify(data, signature)
+    if nonce is None:
+        return False
     expected_signature = sign_qr_code_data(data, nonce)
     return secrets.compare_digest(signature, expected_signature)
 
 
+def verify_qr_code_signatures(items: Iterable[Tuple[bytes, str]]) -> List[bool]:
+    """Batch verify compact QR Codes: (body, signature) pairs"""
+    return qr_signer.verify_many(items)
+
+
 def generate_mfa_secret() -> str:
     """Generate MFA secret for TOTP"""
+    import pyotp
     return pyotp.random_base32()
 
 
 def verify_mfa_token(secret: str, token: str) -> bool:
     """Verify MFA TOTP token"""
+    import pyotp
     totp = pyotp.TOTP(secret)
     return totp.verify(token, valid_window=1)
 
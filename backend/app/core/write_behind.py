@@ -0,0 +1,160 @@
+"""
+Write-behind buffer for non-critical columns
+Timestamps like User.last_login, counters and notification flags don't
+need their own write transaction (and SQLite write lock) on the request
+path. Writes are coalesced in memory per (column, row) and applied every
+WRITE_BEHIND_INTERVAL seconds, and at shutdown, as one executemany UPDATE
+per column. Whatever is still buffered when a worker crashes is lost, so
+only use it for values that can be.
+
+Modes:
+    "set"  last value wins (flags)
+    "max"  keep the newest value, never move the column backwards (timestamps)
+    "add"  sum the increments into col + delta (counters)
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import Column, and_, bindparam, func, or_, update
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.metrics import WRITE_BEHIND_BACKLOG, WRITE_BEHIND_FLUSH, WRITE_BEHIND_ROWS
+
+logger = logging.getLogger(__name__)
+
+MODES = ("set", "max", "add")
+
+
+def _merge(mode: str, current: Any, value: Any) -> Any:
+    if current is None:
+        return value
+    if mode == "add":
+        return current + value
+    if mode == "max":
+        return max(current, value)
+    return value
+
+
+def _statement(column: Column, mode: str):
+    table = column.table
+    (pk,) = table.primary_key.columns
+    where = pk == bindparam("b_id", type_=pk.type)
+    value = bindparam("b_value", type_=column.type)
+    if mode == "add":
+        return update(table).where(where).values({column.name: func.coalesce(column, 0) + value})
+    if mode == "max":
+        where = and_(where, or_(column.is_(None), column < value))
+    return update(table).where(where).values({column.name: value})
+
+
+class WriteBehindBuffer:
+    """Pending writes keyed on (column, mode) -> {row id: value}"""
+
+    def __init__(self, interval: float, max_pending: int):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[Column, str], Dict[Hashable, Any]] = {}
+        self._size = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.flushes = 0
+        self.rows = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+
+    def put(self, attribute: InstrumentedAttribute, row_id: Hashable, value: Any, mode: str = "set") -> None:
+        """Buffer `attribute = value` for one row (no I/O)"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown write-behind mode: {mode}")
+        rows = self._pending.setdefault((attribute.property.columns[0], mode), {})
+        if row_id not in rows:
+            self._size += 1
+            WRITE_BEHIND_BACKLOG.inc()
+        rows[row_id] = _merge(mode, rows.get(row_id), value)
+        if self._size >= self.max_pending:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Apply everything buffered so far; returns rows written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending, size = self._pending, {}, self._size
+            self._size = 0
+            WRITE_BEHIND_BACKLOG.dec(size)
+
+            started = time.perf_counter()
+            try:
+                async with async_engine.begin() as connection:
+                    for (column, mode), rows in batch.items():
+                        await connection.execute(
+                            _statement(column, mode),
+                            [{"b_id": row_id, "b_value": value} for row_id, value in rows.items()]
+                        )
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Write-behind: {size} atualizações não gravadas, nova tentativa no próximo ciclo: {e}")
+                self._restore(batch)
+                return 0
+            finally:
+                seconds = time.perf_counter() - started
+                self.last_flush_ms = round(seconds * 1000, 3)
+                WRITE_BEHIND_FLUSH.observe(seconds)
+
+            self.flushes += 1
+            self.rows += size
+            WRITE_BEHIND_ROWS.inc(size)
+            return size
+
+    def _restore(self, batch: Dict[Tuple[Column, str], Dict[Hashable, Any]]) -> None:
+        """Put a failed batch back, under anything buffered since"""
+        for (column, mode), rows in batch.items():
+            pending = self._pending.setdefault((column, mode), {})
+            for row_id, value in rows.items():
+                if row_id not in pending:
+                    self._size += 1
+                    WRITE_BEHIND_BACKLOG.inc()
+                    pending[row_id] = value
+                elif mode != "set":
+                    pending[row_id] = _merge(mode, pending[row_id], value)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write what is left (not cancelled mid-flush)"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._size,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "failures": self.failures,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+write_behind = WriteBehindBuffer(settings.WRITE_BEHIND_INTERVAL, settings.WRITE_BEHIND_MAX_PENDING)
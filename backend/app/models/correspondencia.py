@@ -1,5 +1,5 @@
 """Correspondência (mail/package) model"""
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Index, Enum as SQLEnum
 from datetime import datetime
 import uuid
 import enum
@@ -27,6 +27,14 @@ class StatusCorrespondencia(str, enum.Enum):
 
 class Correspondencia(Base):
     __tablename__ = "correspondencias"
+    __table_args__ = (
+        # Pending count / list: WHERE status = ? ORDER BY data_recebimento
+        Index("ix_correspondencias_status_data_recebimento", "status", "data_recebimento"),
+        # Per-unit listing and pending-by-unit grouping
+        Index("ix_correspondencias_unidade_id_status", "unidade_id", "status"),
+        # Keyset pagination of the mail list
+        Index("ix_correspondencias_data_recebimento_id", "data_recebimento", "id"),
+    )
     
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     
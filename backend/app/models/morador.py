@@ -1,5 +1,5 @@
 """Morador (resident) model"""
-from sqlalchemy import Column, String, Date, DateTime, Boolean, Text
+from sqlalchemy import Column, String, Date, DateTime, Boolean, Text, Index
 from datetime import datetime
 import uuid
 
@@ -8,6 +8,10 @@ from app.core.database import Base, GUID
 
 class Morador(Base):
     __tablename__ = "moradores"
+    __table_args__ = (
+        # Keyset pagination of the list endpoint
+        Index("ix_moradores_created_at_id", "created_at", "id"),
+    )
     
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     
@@ -33,7 +37,7 @@ class Morador(Base):
     is_active = Column(Boolean, default=True)
     is_inadimplente = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination sort key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
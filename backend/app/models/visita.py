@@ -1,5 +1,5 @@
 """Visita (visit record) model"""
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer, Index, Enum as SQLEnum
 from datetime import datetime
 import uuid
 import enum
@@ -25,6 +25,16 @@ class TipoVisita(str, enum.Enum):
 
 class Visita(Base):
     __tablename__ = "visitas"
+    __table_args__ = (
+        # /visitas/dentro/agora and dashboard: WHERE status = ? ORDER BY data_entrada
+        Index("ix_visitas_status_data_entrada", "status", "data_entrada"),
+        # /visitas/validate-qr lookup
+        Index("ix_visitas_qr_nonce_signature", "qr_nonce", "qr_signature"),
+        # Keyset pagination of the visit list
+        Index("ix_visitas_created_at_id", "created_at", "id"),
+        # Gate replica polls: WHERE updated_at >= ? AND valido_ate > ?
+        Index("ix_visitas_updated_at_valido_ate", "updated_at", "valido_ate"),
+    )
     
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     
@@ -44,7 +54,7 @@ class Visita(Base):
     qr_signature = Column(String(64), nullable=True)
     
     # Timestamps
-    data_prevista = Column(DateTime, nullable=True)
+    data_prevista = Column(DateTime, nullable=True, index=True)
     valido_ate = Column(DateTime, nullable=True)
     
     data_entrada = Column(DateTime, nullable=True)
@@ -59,7 +69,7 @@ class Visita(Base):
     motivo = Column(String(255), nullable=True)
     observacoes = Column(Text, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination sort key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
@@ -1,5 +1,5 @@
 """Visitante (visitor) model"""
-from sqlalchemy import Column, String, Date, DateTime, Boolean, Text, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, Date, DateTime, Boolean, Text, Index, Integer, Enum as SQLEnum
 from datetime import datetime
 import uuid
 import enum
@@ -17,6 +17,12 @@ class TipoDocumento(str, enum.Enum):
 
 class Visitante(Base):
     __tablename__ = "visitantes"
+    __table_args__ = (
+        # Keyset pagination of the list endpoint
+        Index("ix_visitantes_created_at_id", "created_at", "id"),
+        # Frequent-visitor ranking (GET /visitantes/frequentes)
+        Index("ix_visitantes_total_visitas_id", "total_visitas", "id"),
+    )
     
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     
@@ -37,9 +43,9 @@ class Visitante(Base):
     
     # Metadata
     primeira_visita = Column(DateTime, default=datetime.utcnow)
-    total_visitas = Column(Integer, default=0)
+    total_visitas = Column(Integer, default=0)  # visits entered; kept by app.core.entries
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination sort key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
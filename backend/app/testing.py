@@ -0,0 +1,38 @@
+"""
+Pytest plugin with test helpers
+Enable with `pytest -p app.testing`, or `pytest_plugins = ["app.testing"]`
+in a conftest.py.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.database import QueryCounter
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test when the block runs more SQL statements than allowed:
+
+        def test_list_visitas(client, query_budget):
+            with query_budget(2):
+                client.get("/api/v1/visitas")
+
+    Counts statements from every thread, so requests made through
+    TestClient are included.
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with QueryCounter() as counter:
+            yield counter
+        if counter.count > max_queries:
+            statements = "\n".join(
+                f"  {record.duration * 1000:8.2f}ms  {record.fingerprint}" for record in counter.records
+            )
+            pytest.fail(
+                f"{counter.count} consultas SQL (máximo {max_queries}):\n{statements}",
+                pytrace=False
+            )
+
+    return budget
@@ -0,0 +1,151 @@
+"""
+Benchmark: Session síncrona vs AsyncSession dentro de endpoints async
+
+Sobe um app FastAPI mínimo com as duas variantes da mesma consulta e
+dispara requisições concorrentes via httpx (ASGI, sem rede). Em paralelo
+mede o atraso do event loop (lag) para mostrar o bloqueio causado pela
+Session síncrona: é o tempo que qualquer outra requisição ficaria parada.
+
+Uso:
+    python benchmarks/bench_async_db.py [--rows 50000] [--requests 200] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Banco temporário isolado (precisa ser definido antes de importar app.*)
+_tmp_dir = tempfile.mkdtemp(prefix="bench_async_db_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+os.environ["DEBUG"] = "false"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select, func, insert
+
+from app.core.database import Base, engine, SessionLocal, AsyncSessionLocal, async_engine
+from app.models import Visita
+from app.models.visita import StatusVisita
+
+# Consulta propositalmente pesada (full scan com LIKE)
+SLOW_QUERY = select(func.count(Visita.id)).where(Visita.motivo.like("%entrega%"))
+
+
+def seed(rows: int) -> None:
+    """Cria as tabelas e insere visitas sintéticas"""
+    import uuid
+    Base.metadata.create_all(bind=engine)
+    visitante_id, unidade_id = str(uuid.uuid4()), str(uuid.uuid4())
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "visitante_id": visitante_id,
+                "unidade_id": unidade_id,
+                "tipo": "COMUM",
+                "status": StatusVisita.FINALIZADA.name,
+                "motivo": "entrega de encomenda" if i % 7 == 0 else "visita social",
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(Visita.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Visita.__table__), batch)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_session():
+        # Padrão antigo: Session síncrona dentro de async def
+        db = SessionLocal()
+        try:
+            return {"total": db.scalar(SLOW_QUERY)}
+        finally:
+            db.close()
+
+    @app.get("/async")
+    async def async_session():
+        async with AsyncSessionLocal() as db:
+            return {"total": await db.scalar(SLOW_QUERY)}
+
+    return app
+
+
+async def run_mode(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+    lags = []
+
+    async def one():
+        async with sem:
+            r = await client.get(path)
+            r.raise_for_status()
+
+    async def lag_probe():
+        # Dorme 5 ms e mede quanto o event loop demorou a devolver o controle
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append((time.perf_counter() - start - 0.005) * 1000)
+
+    probe_task = asyncio.create_task(lag_probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    lags.sort()
+    return {
+        "rps": total / elapsed,
+        "elapsed": elapsed,
+        "lag_p50": statistics.median(lags) if lags else 0.0,
+        "lag_max": lags[-1] if lags else 0.0,
+    }
+
+
+async def main_async(args) -> None:
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Aquecimento (pool de conexões e cache de páginas do SQLite)
+        await client.get("/sync")
+        await client.get("/async")
+
+        results = {}
+        for label, path in (("Session síncrona", "/sync"), ("AsyncSession", "/async")):
+            results[label] = await run_mode(client, path, args.requests, args.concurrency)
+
+    await async_engine.dispose()
+
+    print("=" * 72)
+    print(f"📊 {args.requests} requisições, concorrência {args.concurrency}, {args.rows} visitas")
+    print("=" * 72)
+    print(f"{'modo':<20}{'req/s':>10}{'tempo (s)':>12}{'lag p50 ms':>14}{'lag máx ms':>14}")
+    for label, r in results.items():
+        print(f"{label:<20}{r['rps']:>10.1f}{r['elapsed']:>12.2f}{r['lag_p50']:>14.1f}{r['lag_max']:>14.1f}")
+    print("=" * 72)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"🔧 Populando {args.rows} visitas em {_tmp_dir}...")
+    seed(args.rows)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: renovar a sessão com /auth/login (bcrypt) vs /auth/refresh
+
+Simula terminais da portaria renovando o token de acesso: N renovações
+sequenciais refazendo o login (verificação bcrypt de 12 rounds) contra N
+trocas do refresh token (uma verificação HMAC, com rotação). Confere
+também que um refresh token só vale uma vez. Sai com código 1 se algo
+divergir.
+
+Uso:
+    python benchmarks/bench_auth_refresh.py [--renewals 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renewals", type=int, default=50)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench_auth_')}/bench.db"
+os.environ.setdefault("DEBUG", "false")
+
+import httpx
+
+from main import app, lifespan
+
+CREDENTIALS = {"username": "porteiro@bench.com", "password": "senha-do-porteiro"}
+
+
+async def timed(calls) -> list:
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def main():
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            (await client.post("/api/v1/auth/register", json={
+                "email": CREDENTIALS["username"], "password": CREDENTIALS["password"],
+                "nome": "Porteiro Bench"
+            })).raise_for_status()
+
+            async def login():
+                response = await client.post("/api/v1/auth/login", data=CREDENTIALS)
+                response.raise_for_status()
+                return response.json()
+
+            tokens = await login()
+
+            async def refresh():
+                nonlocal tokens
+                response = await client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+                response.raise_for_status()
+                tokens = response.json()
+
+            print(f"⏱️  {args.renewals} renovações com /auth/login...")
+            by_login = await timed([login] * args.renewals)
+            print(f"⏱️  {args.renewals} renovações com /auth/refresh...")
+            by_refresh = await timed([refresh] * args.renewals)
+
+            used = tokens["refresh_token"]
+            await refresh()
+            reuse = await client.post("/api/v1/auth/refresh", json={"refresh_token": used})
+
+    print("\n" + "=" * 52)
+    print(f"{'renovação':<20}{'mediana ms':>12}{'p95 ms':>10}{'por s':>10}")
+    print("=" * 52)
+    for label, samples in (("/auth/login", by_login), ("/auth/refresh", by_refresh)):
+        p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+        print(f"{label:<20}{statistics.median(samples):>12.2f}{p95:>10.2f}{1000 / statistics.mean(samples):>10.0f}")
+    print("=" * 52)
+    print(f"🚀 Refresh {statistics.median(by_login) / statistics.median(by_refresh):.0f}x mais rápido que o login")
+
+    if reuse.status_code != 401:
+        print(f"❌ Refresh token reutilizado foi aceito ({reuse.status_code})")
+        sys.exit(1)
+    print("✅ Refresh token reutilizado recusado (401)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
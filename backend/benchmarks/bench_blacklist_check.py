@@ -0,0 +1,154 @@
+"""
+Benchmark: consulta de blacklist pelo índice em memória vs banco
+
+Cadastra N visitantes (uma fração bloqueada) e mede
+GET /visitantes/blacklist/check (Bloom filter + conjunto exato, sem
+consulta) contra GET /visitantes/documento/{doc} (busca no banco), por
+documento e por id. Confere também que a resposta "não bloqueado" não
+faz nenhuma consulta (X-DB-Queries) e que bloquear/desbloquear um
+visitante vale na hora. Sai com código 1 se algo divergir.
+
+Uso:
+    python benchmarks/bench_blacklist_check.py [--visitors 5000] [--blacklisted 0.02] [--checks 500]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--visitors", type=int, default=5000)
+    parser.add_argument("--blacklisted", type=float, default=0.02, help="fração de visitantes bloqueados")
+    parser.add_argument("--checks", type=int, default=500)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench_blacklist_')}/bench.db"
+os.environ["DEBUG"] = "true"  # X-DB-Queries header
+
+import logging
+
+import httpx
+from sqlalchemy import insert, select, update
+
+from main import app, lifespan
+from app.core.blacklist import blacklist_index
+from app.core.database import AsyncSessionLocal
+from app.models.visitante import Visitante
+
+logging.disable(logging.INFO)
+
+
+def cpf(number: int) -> str:
+    digits = f"{number:011d}"
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+async def seed() -> list:
+    rows = [
+        {
+            "id": uuid.uuid4(), "nome_completo": f"Visitante {i}", "numero_documento": cpf(i),
+            "is_blacklisted": random.random() < args.blacklisted,
+        }
+        for i in range(args.visitors)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Visitante), rows)
+        await db.commit()
+    return rows
+
+
+async def timed(client: httpx.AsyncClient, urls: list) -> list:
+    latencies = []
+    for url in urls:
+        started = time.perf_counter()
+        (await client.get(url)).raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def main():
+    random.seed(42)
+    failures = []
+    async with lifespan(app):
+        rows = await seed()
+        await blacklist_index.rebuild()  # as at startup
+        sample = random.sample(rows, min(args.checks, len(rows)))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"⏱️  {len(sample)} consultas de cada tipo ({args.visitors} visitantes)...")
+            by_db = await timed(client, [f"/api/v1/visitantes/documento/{row['numero_documento']}" for row in sample])
+            by_doc = await timed(client, [
+                f"/api/v1/visitantes/blacklist/check?documento={row['numero_documento'].replace('.', '').replace('-', '')}"
+                for row in sample
+            ])
+            by_id = await timed(client, [f"/api/v1/visitantes/blacklist/check?visitante_id={row['id']}" for row in sample])
+
+            wrong = 0
+            for row in sample:
+                response = await client.get(f"/api/v1/visitantes/blacklist/check?documento={row['numero_documento']}")
+                wrong += response.json()["blacklisted"] != row["is_blacklisted"]
+                if not row["is_blacklisted"] and response.headers["X-DB-Queries"] != "0":
+                    failures.append(f"'não bloqueado' consultou o banco ({response.headers['X-DB-Queries']} consultas)")
+                    break
+            if wrong:
+                failures.append(f"{wrong} respostas erradas")
+
+            # Bloquear e desbloquear pelo ORM: o índice acompanha o commit
+            target = next(row for row in rows if not row["is_blacklisted"])
+            url = f"/api/v1/visitantes/blacklist/check?visitante_id={target['id']}"
+            async with AsyncSessionLocal() as db:
+                visitante = await db.scalar(select(Visitante).where(Visitante.id == target["id"]))
+                visitante.is_blacklisted = True
+                await db.commit()
+                if not (await client.get(url)).json()["blacklisted"]:
+                    failures.append("bloqueio não refletido no índice")
+                visitante.is_blacklisted = False
+                await db.commit()
+                if (await client.get(url)).json()["blacklisted"]:
+                    failures.append("desbloqueio não refletido no índice")
+
+                # UPDATE em massa: linhas desconhecidas, o índice é recarregado
+                await db.execute(update(Visitante).where(Visitante.id == target["id"]).values(is_blacklisted=True))
+                await db.commit()
+                await blacklist_index.rebuild()
+                if not (await client.get(url)).json()["blacklisted"]:
+                    failures.append("UPDATE em massa não refletido após recarga")
+
+    print("\n" + "=" * 60)
+    print(f"{'consulta':<28}{'mediana ms':>12}{'p95 ms':>10}{'por s':>10}")
+    print("=" * 60)
+    for label, samples in (
+        ("banco (documento)", by_db), ("índice (documento)", by_doc), ("índice (visitante_id)", by_id)
+    ):
+        p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+        print(f"{label:<28}{statistics.median(samples):>12.2f}{p95:>10.2f}{1000 / statistics.mean(samples):>10.0f}")
+    print("=" * 60)
+    stats = blacklist_index.stats()
+    print(f"📊 {stats['visitantes']} bloqueados, {stats['bloom_bits']} bits no Bloom filter, "
+          f"{stats['bloom_negatives']}/{stats['checks']} respondidas só pelo filtro, "
+          f"{stats['false_positives']} falsos positivos")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ {statistics.median(by_db) / statistics.median(by_doc):.1f}x mais rápido que o banco, "
+          "'não bloqueado' sem consulta e alterações refletidas no commit")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
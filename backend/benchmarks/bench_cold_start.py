@@ -0,0 +1,120 @@
+"""
+Benchmark: tempo de cold start (deploy + boot da API)
+
+Mede, num SQLite temporário:
+  1. o deploy antigo: create_all + admin apagado e recriado com bcrypt
+     (o que o init_db.py fazia a cada deploy);
+  2. `python init_db.py` no primeiro deploy (banco vazio: migrações + admin)
+     e num redeploy (banco em dia: só a checagem de versão);
+  3. o boot da API (`uvicorn main:app`) até o primeiro 200 em /health.
+
+Falha (exit 1) se redeploy + boot (mediana) passar de --budget-ms.
+
+Uso:
+    python benchmarks/bench_cold_start.py [--runs 5] [--budget-ms 3000]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+LEGACY_DEPLOY = """
+import app.models, app.models.correspondencia
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import get_password_hash
+from app.models.user import User
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+existing = db.query(User).filter(User.email == "admin@portaria.com").first()
+if existing:
+    db.delete(existing)
+    db.commit()
+db.add(User(email="admin@portaria.com", password_hash=get_password_hash("admin123"), nome="Administrador", role="admin"))
+db.commit()
+"""
+
+
+def timed_run(args: list, env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run(args, cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def timed_boot(env: dict, port: int, timeout: float = 30.0) -> float:
+    """Milissegundos entre o spawn do uvicorn e o primeiro 200 em /health"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get("/health").status_code == 200:
+                        return (time.perf_counter() - started) * 1000
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError("API não respondeu a tempo")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=3000.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DEBUG="false")
+        init_db = [sys.executable, "init_db.py"]
+
+        print(f"⏱️  Deploy antigo (create_all + admin recriado), {args.runs} rodadas...")
+        legacy = []
+        for run in range(args.runs):
+            env["DATABASE_URL"] = f"sqlite:///{Path(tmp) / f'legacy{run}.db'}"
+            legacy.append(timed_run([sys.executable, "-c", LEGACY_DEPLOY], env))
+
+        print(f"⏱️  init_db.py no primeiro deploy e em redeploys, {args.runs} rodadas...")
+        first, again = [], []
+        for run in range(args.runs):
+            env["DATABASE_URL"] = f"sqlite:///{Path(tmp) / f'portaria{run}.db'}"
+            first.append(timed_run(init_db, env))
+            again.append(timed_run(init_db, env))
+
+        print(f"⏱️  Boot da API até /health, {args.runs} rodadas...")
+        boot = [timed_boot(env, args.port) for _ in range(args.runs)]
+
+    print("\n" + "=" * 56)
+    print(f"{'etapa':<36}{'mediana ms':>10}{'máx ms':>10}")
+    print("=" * 56)
+    for label, samples in (
+        ("deploy antigo (create_all + bcrypt)", legacy),
+        ("init_db.py, banco vazio", first),
+        ("init_db.py, redeploy", again),
+        ("boot da API até /health", boot),
+    ):
+        print(f"{label:<36}{statistics.median(samples):>10.0f}{max(samples):>10.0f}")
+    print("=" * 56)
+
+    total = statistics.median(again) + statistics.median(boot)
+    if total > args.budget_ms:
+        print(f"❌ Redeploy + boot em {total:.0f}ms, acima do orçamento de {args.budget_ms:.0f}ms")
+        sys.exit(1)
+    print(f"✅ Redeploy + boot em {total:.0f}ms (orçamento: {args.budget_ms:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: tempo de import do processo da API (`-X importtime`)
+
+Importa `main` em subprocessos novos com `python -X importtime`, mostra
+os pacotes mais caros (tempo próprio somado por pacote; módulos do app
+aparecem individualmente) e falha (exit 1) se:
+  - a mediana do import de `main` passar de --budget-ms, ou
+  - algum módulo opcional pesado for importado no boot (segno, pyotp,
+    httpx, faker...): eles devem ser importados só onde são usados.
+
+Uso:
+    python benchmarks/bench_import_time.py [--runs 5] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Usados por um endpoint, pelo modo portaria ou por scripts; nunca no boot
+LAZY_MODULES = ("segno", "qrcode", "PIL", "pyotp", "httpx", "faker", "redis", "passlib")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_main() -> List[Tuple[int, int, int, str]]:
+    """(self µs, cumulative µs, depth, module) in the order importtime prints them"""
+    env = dict(os.environ, DEBUG="false")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            rows.append((int(own), int(cumulative), len(indent), module))
+    return rows
+
+
+def importer(rows: List[Tuple[int, int, int, str]], index: int) -> str:
+    """Module that imported rows[index] (printed after it, one level up)"""
+    depth = rows[index][2]
+    for _, _, parent_depth, module in rows[index + 1:]:
+        if parent_depth < depth:
+            return module
+    return "?"
+
+
+def group(module: str) -> str:
+    return module if module.startswith("app.") or module == "main" else module.split(".")[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    import_main()  # aquece o cache de bytecode
+    print(f"⏱️  Importando main {args.runs} vezes com -X importtime...")
+    runs = [import_main() for _ in range(args.runs)]
+    totals = [next(cumulative for _, cumulative, _, module in rows if module == "main") / 1000 for rows in runs]
+    median_run = sorted(runs, key=lambda rows: len(rows))[len(runs) // 2]
+
+    by_group = Counter()
+    for own, _, _, module in median_run:
+        by_group[group(module)] += own
+
+    print("\n" + "=" * 46)
+    print(f"{'pacote / módulo':<34}{'próprio ms':>12}")
+    print("=" * 46)
+    for name, own in by_group.most_common(args.top):
+        print(f"{name:<34}{own / 1000:>12.1f}")
+    print("=" * 46)
+    print(f"import main: mediana {statistics.median(totals):.0f}ms | "
+          f"mín {min(totals):.0f}ms | máx {max(totals):.0f}ms | {len(median_run)} módulos")
+
+    failed = False
+    for index, (_, cumulative, _, module) in enumerate(median_run):
+        if module.split(".")[0] in LAZY_MODULES and importer(median_run, index).split(".")[0] != module.split(".")[0]:
+            print(f"❌ {module} importado no boot por {importer(median_run, index)} ({cumulative / 1000:.1f}ms)")
+            failed = True
+
+    if statistics.median(totals) > args.budget_ms:
+        print(f"❌ Import de main acima do orçamento de {args.budget_ms:.0f}ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"✅ Dentro do orçamento de {args.budget_ms:.0f}ms, sem imports opcionais no boot")
+
+
+if __name__ == "__main__":
+    main()
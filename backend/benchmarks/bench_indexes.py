@@ -0,0 +1,219 @@
+"""
+Benchmark: planos de consulta antes e depois das migrações de índices
+
+Cria o schema na revisão 0001 (sem índices), popula visitas e
+correspondências sintéticas, mede as consultas quentes da portaria e do
+dashboard, aplica `alembic upgrade head` e mede de novo. Falha (exit 1) se
+alguma consulta continuar fazendo full scan depois dos índices.
+
+Uso:
+    python benchmarks/bench_indexes.py [--rows 5000000] [--database-url URL]
+
+Sem --database-url usa um SQLite temporário. Com PostgreSQL, aponte para
+um banco vazio e descartável.
+"""
+import argparse
+import os
+import random
+import re
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DEBUG", "false")
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, text
+
+from app.models.visita import Visita, StatusVisita, TipoVisita
+from app.models.correspondencia import Correspondencia, StatusCorrespondencia, TipoCorrespondencia
+
+BATCH_SIZE = 10000
+UNIDADES = [uuid.uuid4() for _ in range(200)]
+NOW = datetime.utcnow().replace(microsecond=0)
+
+# (nome, SQL) - mesmas consultas que os endpoints emitem
+QUERIES = [
+    ("visitas dentro agora",
+     "SELECT id FROM visitas WHERE status = :status_dentro ORDER BY data_entrada DESC"),
+    ("programação do dia",
+     "SELECT id FROM visitas WHERE data_prevista >= :inicio AND data_prevista < :fim ORDER BY data_prevista"),
+    ("validate-qr",
+     "SELECT id FROM visitas WHERE qr_nonce = :nonce AND qr_signature = :signature"),
+    ("lista de visitas",
+     "SELECT id FROM visitas ORDER BY created_at DESC, id DESC LIMIT 51"),
+    ("correspondências aguardando",
+     "SELECT count(id) FROM correspondencias WHERE status = :status_aguardando"),
+    ("correspondências por unidade",
+     "SELECT id FROM correspondencias WHERE unidade_id = :unidade_id AND status = :status_aguardando"),
+    ("lista de correspondências",
+     "SELECT id FROM correspondencias ORDER BY data_recebimento DESC, id DESC LIMIT 51"),
+]
+
+FULL_SCAN = {
+    "sqlite": re.compile(r"\bSCAN (visitas|correspondencias)\b(?! USING)"),
+    "postgresql": re.compile(r"Seq Scan"),
+}
+
+
+def alembic_config(url: str) -> Config:
+    cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+    cfg.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def seed(engine, rows: int) -> dict:
+    """Popula visitas (rows) e correspondências (rows / 5); devolve parâmetros reais"""
+    rng = random.Random(42)
+    sample = {}
+    visitas = Visita.__table__
+    correspondencias = Correspondencia.__table__
+    three_years = 3 * 365 * 24 * 3600
+
+    with engine.begin() as conn:
+        batch = []
+        for i in range(rows):
+            created = NOW - timedelta(seconds=rng.randrange(three_years))
+            dentro = rng.random() < 0.001
+            nonce = secrets.token_urlsafe(16)
+            signature = secrets.token_hex(32)
+            batch.append({
+                "id": uuid.uuid4(),
+                "visitante_id": uuid.uuid4(),
+                "unidade_id": rng.choice(UNIDADES),
+                "tipo": TipoVisita.COMUM,
+                "status": StatusVisita.DENTRO if dentro else StatusVisita.FINALIZADA,
+                "qr_nonce": nonce,
+                "qr_signature": signature,
+                "data_prevista": created,
+                "valido_ate": created + timedelta(hours=24),
+                "data_entrada": created,
+                "created_at": created,
+            })
+            if i == rows // 2:
+                sample["nonce"], sample["signature"] = nonce, signature
+            if len(batch) == BATCH_SIZE:
+                conn.execute(insert(visitas), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(visitas), batch)
+
+        batch = []
+        for _ in range(max(rows // 5, 1)):
+            recebido = NOW - timedelta(seconds=rng.randrange(three_years))
+            aguardando = rng.random() < 0.01
+            batch.append({
+                "id": uuid.uuid4(),
+                "unidade_id": rng.choice(UNIDADES),
+                "destinatario": "Morador",
+                "tipo": TipoCorrespondencia.CAIXA_PEQUENA,
+                "recebido_por": "Porteiro",
+                "data_recebimento": recebido,
+                "status": StatusCorrespondencia.AGUARDANDO_RETIRADA if aguardando else StatusCorrespondencia.ENTREGUE,
+            })
+            if len(batch) == BATCH_SIZE:
+                conn.execute(insert(correspondencias), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(correspondencias), batch)
+
+    inicio = datetime.combine(NOW.date(), datetime.min.time())
+    sample.update({
+        "status_dentro": StatusVisita.DENTRO.name,
+        "status_aguardando": StatusCorrespondencia.AGUARDANDO_RETIRADA.name,
+        "unidade_id": str(UNIDADES[0]),
+        "inicio": inicio,
+        "fim": inicio + timedelta(days=1),
+    })
+    if engine.dialect.name == "sqlite":
+        # Mesmo formato em que o SQLAlchemy grava DateTime no SQLite
+        for key in ("inicio", "fim"):
+            sample[key] = sample[key].strftime("%Y-%m-%d %H:%M:%S.%f")
+    return sample
+
+
+def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+        return " | ".join(row[-1] for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {sql}"), params).all()
+    return " | ".join(row[0].strip() for row in rows)
+
+
+def measure(engine, params: dict, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(text(sql), params).all()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = (statistics.median(timings), explain(conn, sql, params))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000, help="quantidade de visitas")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench_indexes_')}/bench.db"
+    engine = create_engine(url)
+    cfg = alembic_config(url)
+
+    print(f"🔧 Schema na revisão 0001 (sem índices) em {url}")
+    command.upgrade(cfg, "0001")
+
+    print(f"📦 Populando {args.rows:,} visitas e {max(args.rows // 5, 1):,} correspondências...")
+    start = time.perf_counter()
+    params = seed(engine, args.rows)
+    print(f"   concluído em {time.perf_counter() - start:.1f}s")
+
+    before = measure(engine, params, args.repeat)
+
+    print("🔧 Aplicando migrações de índices (alembic upgrade head)...")
+    start = time.perf_counter()
+    command.upgrade(cfg, "head")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"   concluído em {time.perf_counter() - start:.1f}s")
+
+    after = measure(engine, params, args.repeat)
+
+    full_scan = FULL_SCAN.get(engine.dialect.name)
+    failures = []
+    print("\n" + "=" * 100)
+    print(f"{'consulta':<32}{'antes (ms)':>12}{'depois (ms)':>13}{'ganho':>9}")
+    print("=" * 100)
+    for name, _ in QUERIES:
+        t_before, plan_before = before[name]
+        t_after, plan_after = after[name]
+        speedup = t_before / t_after if t_after else float("inf")
+        print(f"{name:<32}{t_before:>12.2f}{t_after:>13.2f}{speedup:>8.0f}x")
+        print(f"   antes : {plan_before}")
+        print(f"   depois: {plan_after}")
+        if full_scan and full_scan.search(plan_after):
+            failures.append(name)
+    print("=" * 100)
+
+    if failures:
+        print(f"❌ Ainda com full scan: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ Todas as consultas usam índice após a migração")
+
+
+if __name__ == "__main__":
+    main()
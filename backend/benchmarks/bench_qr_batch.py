@@ -0,0 +1,175 @@
+"""
+Benchmark: envio em lote de leituras offline
+
+Cria N visitas e compara registrar a entrada de todas com N chamadas a
+POST /visitas/validate-qr contra um único POST /visitas/validate-qr/batch.
+O lote inclui cada código lido duas vezes (fora de ordem), um código
+falsificado e um lido depois de expirar; confere que cada visita entrou
+exatamente uma vez, com o horário da leitura mais antiga, e que os
+resultados voltam na ordem enviada. Sai com código 1 se algo divergir.
+
+Uso:
+    python benchmarks/bench_qr_batch.py [--visits 2000] [--database-url URL]
+
+Sem --database-url usa um SQLite temporário. Com PostgreSQL, aponte para
+um banco vazio e descartável.
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--visits", type=int, default=2000, help="visitas por rodada (máx. 2499 no lote)")
+    parser.add_argument("--database-url", default=None)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = (
+    args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench_qr_batch_')}/bench.db"
+)
+os.environ.setdefault("DEBUG", "false")
+
+import httpx
+
+from main import app, lifespan
+from app.core.database import AsyncSessionLocal
+from app.core.qr_payload import QR_NONCE_SIZE, pack_qr_body, encode_compact_qr
+from app.core.security import qr_signer, sign_qr_code_data
+from app.models.visita import Visita, StatusVisita
+from app.models.visitante import Visitante
+from app.models.condominio import Condominio
+from app.models.unidade import Unidade
+
+
+async def create_visits(count: int, valid_for: timedelta = timedelta(hours=1)) -> list:
+    """Visitas agendadas com o mesmo payload que POST /visitas gera; retorna os tokens"""
+    async with AsyncSessionLocal() as db:
+        condominio = Condominio(
+            nome="Condomínio Bench", cnpj=uuid.uuid4().hex[:14], endereco="Rua Bench, 1",
+            cidade="São Paulo", estado="SP", cep="01000000"
+        )
+        db.add(condominio)
+        await db.flush()
+        unidade = Unidade(condominio_id=condominio.id, numero=uuid.uuid4().hex[:6], bloco="B")
+        visitante = Visitante(nome_completo="Visitante Bench", numero_documento=uuid.uuid4().hex[:11])
+        db.add_all([unidade, visitante])
+        await db.flush()
+
+        valido_ate = (datetime.utcnow() + valid_for).replace(microsecond=0)
+        tokens = []
+        for _ in range(count):
+            nonce = secrets.token_bytes(QR_NONCE_SIZE)
+            body = pack_qr_body(visitante.id, unidade.id, valido_ate, nonce, key_id=qr_signer.active_key_id)
+            signature = sign_qr_code_data(body)
+            qr_code = encode_compact_qr(body, signature)
+            db.add(Visita(
+                visitante_id=visitante.id,
+                unidade_id=unidade.id,
+                status=StatusVisita.AUTORIZADA,
+                valido_ate=valido_ate,
+                qr_code=qr_code,
+                qr_nonce=nonce.hex(),
+                qr_signature=signature,
+            ))
+            tokens.append(qr_code)
+        await db.commit()
+        return tokens
+
+
+def forge(token: str) -> str:
+    """Troca o último caractere: o payload continua decodificável, a assinatura não confere"""
+    return token[:-1] + ("0" if token[-1] != "0" else "1")
+
+
+async def main():
+    errors = []
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"📦 Criando {args.visits:,} visitas para cada rodada...")
+            one_by_one = await create_visits(args.visits)
+            batched = await create_visits(args.visits)
+            expired = (await create_visits(1, valid_for=timedelta(seconds=1)))[0]
+
+            print("🐢 Uma chamada por leitura...")
+            start = time.perf_counter()
+            for token in one_by_one:
+                response = await client.post("/api/v1/visitas/validate-qr", json={"qr": token})
+                if response.status_code != 200 or response.json()["status"] != "success":
+                    errors.append(f"validate-qr: HTTP {response.status_code}")
+            single_elapsed = time.perf_counter() - start
+
+            # Cada código lido duas vezes, em ordem embaralhada; a primeira leitura deve valer
+            base = datetime.utcnow() - timedelta(minutes=30)
+            scans = []
+            first_scan = {}
+            for i, token in enumerate(batched):
+                first, second = base + timedelta(milliseconds=i), base + timedelta(milliseconds=i, minutes=5)
+                first_scan[token] = first.isoformat()
+                scans += [
+                    {"qr": token, "scanned_at": second.isoformat()},
+                    {"qr": token, "scanned_at": first.isoformat()},
+                ]
+            random.shuffle(scans)
+            scans.append({"qr": forge(batched[0]), "scanned_at": base.isoformat()})
+            scans.append({"qr": expired, "scanned_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()})
+            # Lido (offline) antes de expirar: ainda vale
+            scans.append({"qr": expired, "scanned_at": base.isoformat()})
+
+            print(f"🚀 Um lote com {len(scans):,} leituras...")
+            await asyncio.sleep(1)  # deixa o código "expired" expirar no servidor
+            start = time.perf_counter()
+            response = await client.post("/api/v1/visitas/validate-qr/batch", json={"scans": scans})
+            batch_elapsed = time.perf_counter() - start
+
+    if response.status_code != 200:
+        print(f"❌ validate-qr/batch: HTTP {response.status_code} {response.text[:200]}")
+        sys.exit(1)
+    results = response.json()["results"]
+    outcomes = collections.Counter(result["status"] for result in results)
+
+    if len(results) != len(scans):
+        errors.append("número de resultados diferente do número de leituras")
+    for scan, result in zip(scans, results):
+        token = scan["qr"]
+        if result["status"] == "success" and token in first_scan and result["entrada_em"] != first_scan[token]:
+            errors.append("entrada registrada com uma leitura que não é a mais antiga")
+            break
+    expected = {"success": args.visits + 1, "already_used": args.visits, "forged": 1, "expired": 1}
+    if dict(outcomes) != expected:
+        errors.append(f"resultados {dict(outcomes)} != {expected}")
+
+    print("\n" + "=" * 56)
+    print(f"{'rodada':<28}{'tempo (s)':>12}{'leituras/s':>16}")
+    print("=" * 56)
+    print(f"{'uma chamada por leitura':<28}{single_elapsed:>12.2f}{args.visits / single_elapsed:>16,.0f}")
+    print(f"{'lote único':<28}{batch_elapsed:>12.2f}{len(scans) / batch_elapsed:>16,.0f}")
+    print("=" * 56)
+    for outcome, count in outcomes.most_common():
+        print(f"   {outcome:<14}{count:>6}")
+
+    if errors:
+        for error in errors[:10]:
+            print(f"❌ {error}")
+        sys.exit(1)
+    print(f"✅ Lote {(len(scans) / batch_elapsed) / (args.visits / single_elapsed):.0f}x mais rápido por leitura, "
+          "cada visita entrou uma vez com a leitura mais antiga")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""
+Teste de concorrência: leituras simultâneas do mesmo QR Code
+
+Cria uma visita, dispara N chamadas paralelas a POST /visitas/validate-qr
+com o mesmo código (como várias catracas lendo ao mesmo tempo) e confere
+que exatamente uma registrou a entrada e as demais receberam
+"already_used". Sai com código 1 se houver mais de uma entrada.
+
+Uso:
+    python benchmarks/bench_qr_concurrency.py [--scans 100] [--database-url URL]
+
+Sem --database-url usa um SQLite temporário. Com PostgreSQL, aponte para
+um banco vazio e descartável.
+"""
+import argparse
+import asyncio
+import collections
+import os
+import secrets
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=100, help="leituras simultâneas")
+    parser.add_argument("--database-url", default=None)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = (
+    args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench_qr_')}/bench.db"
+)
+os.environ.setdefault("DEBUG", "false")
+
+import httpx
+
+from main import app, lifespan
+from app.core.database import AsyncSessionLocal
+from app.core.qr_payload import QR_NONCE_SIZE, pack_qr_body, encode_compact_qr
+from app.core.security import qr_signer, sign_qr_code_data
+from app.models.visita import Visita, StatusVisita
+from app.models.visitante import Visitante
+from app.models.condominio import Condominio
+from app.models.unidade import Unidade
+
+
+async def create_visit() -> dict:
+    """Visita agendada com o mesmo payload que POST /visitas gera"""
+    async with AsyncSessionLocal() as db:
+        condominio = Condominio(
+            nome="Condomínio Bench", cnpj=uuid.uuid4().hex[:14], endereco="Rua Bench, 1",
+            cidade="São Paulo", estado="SP", cep="01000000"
+        )
+        db.add(condominio)
+        await db.flush()
+        unidade = Unidade(condominio_id=condominio.id, numero=uuid.uuid4().hex[:6], bloco="B")
+        visitante = Visitante(nome_completo="Visitante Bench", numero_documento=uuid.uuid4().hex[:11])
+        db.add_all([unidade, visitante])
+        await db.flush()
+
+        valido_ate = (datetime.utcnow() + timedelta(hours=1)).replace(microsecond=0)
+        nonce = secrets.token_bytes(QR_NONCE_SIZE)
+        body = pack_qr_body(visitante.id, unidade.id, valido_ate, nonce, key_id=qr_signer.active_key_id)
+        signature = sign_qr_code_data(body)
+        qr_code = encode_compact_qr(body, signature)
+        db.add(Visita(
+            visitante_id=visitante.id,
+            unidade_id=unidade.id,
+            status=StatusVisita.AUTORIZADA,
+            valido_ate=valido_ate,
+            qr_code=qr_code,
+            qr_nonce=nonce.hex(),
+            qr_signature=signature,
+        ))
+        await db.commit()
+        return {"qr": qr_code}
+
+
+async def main():
+    async with lifespan(app):
+        qr_data = await create_visit()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"🚦 Disparando {args.scans} leituras simultâneas do mesmo QR Code...")
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/api/v1/visitas/validate-qr", json=qr_data)
+                for _ in range(args.scans)
+            ])
+            elapsed = time.perf_counter() - start
+
+    outcomes = collections.Counter(
+        r.json().get("status", f"HTTP {r.status_code}") if r.status_code == 200 else f"HTTP {r.status_code}"
+        for r in responses
+    )
+    print(f"   concluído em {elapsed:.2f}s")
+    for outcome, count in outcomes.most_common():
+        print(f"   {outcome:<14}{count:>5}")
+
+    if outcomes["success"] != 1 or outcomes["already_used"] != args.scans - 1:
+        print("❌ A entrada não foi registrada exatamente uma vez")
+        sys.exit(1)
+    print("✅ Entrada registrada exatamente uma vez")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Benchmark: codificadores de QR Code (qrcode+PIL vs segno)
+
+Gera o QR do payload de uma visita com o caminho antigo (qrcode + PIL,
+PNG em data URI base64 dentro do JSON) e com o segno (PNG e SVG crus),
+medindo tempo por codificação e tamanho do que vai pela rede. Compara
+também a versão de QR exigida pelo payload JSON legado e pelo compacto.
+
+Uso:
+    python benchmarks/bench_qr_encoders.py [--iterations 300]
+"""
+import argparse
+import base64
+import io
+import json
+import secrets
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import qrcode
+import segno
+
+from app.core.qr import QR_ERROR_LEVEL, render_qr
+from app.core.qr_payload import QR_NONCE_SIZE, pack_qr_body, encode_compact_qr
+from app.core.security import qr_signer, sign_qr_code_data
+
+
+def legacy_payload() -> str:
+    """Formato JSON antigo de qr_code"""
+    return json.dumps({
+        "visita_id": str(uuid.uuid4()),
+        "visitante_id": str(uuid.uuid4()),
+        "unidade_id": str(uuid.uuid4()),
+        "valido_ate": (datetime.utcnow() + timedelta(hours=24)).isoformat(),
+        "nonce": secrets.token_urlsafe(16),
+        "signature": secrets.token_hex(32),
+    })
+
+
+def compact_payload() -> str:
+    """Mesmo formato que POST /visitas grava em qr_code"""
+    valid_until = (datetime.utcnow() + timedelta(hours=24)).replace(microsecond=0)
+    body = pack_qr_body(
+        uuid.uuid4(), uuid.uuid4(), valid_until, secrets.token_bytes(QR_NONCE_SIZE),
+        key_id=qr_signer.active_key_id
+    )
+    return encode_compact_qr(body, sign_qr_code_data(body))
+
+
+def encode_pil(payload: str) -> bytes:
+    """Caminho antigo do endpoint (mesma correção de erro H)"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def data_uri(png: bytes) -> bytes:
+    """Resposta JSON como o frontend recebe"""
+    body = {"qr_code_image": f"data:image/png;base64,{base64.b64encode(png).decode()}"}
+    return json.dumps(body).encode()
+
+
+def timed(func, payload: str, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        out = func(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    legacy, compact = legacy_payload(), compact_payload()
+    print(f"📦 {args.iterations} iterações por codificador | segno {segno.__version__} | correção de erro {QR_ERROR_LEVEL.upper()}")
+    for name, payload in (("JSON legado", legacy), ("compacto", compact)):
+        qr = segno.make(payload, error=QR_ERROR_LEVEL, micro=False)
+        print(f"   {name:<12}{len(payload):>5} caracteres -> QR versão {qr.version} ({qr.mode})")
+
+    cases = [
+        ("qrcode+PIL PNG (JSON base64)", legacy, encode_pil, data_uri),
+        ("segno PNG (JSON base64)", legacy, lambda p: render_qr(p, "png"), data_uri),
+        ("segno PNG (image/png)", legacy, lambda p: render_qr(p, "png"), None),
+        ("segno SVG (image/svg+xml)", legacy, lambda p: render_qr(p, "svg"), None),
+        ("compacto segno PNG", compact, lambda p: render_qr(p, "png"), None),
+        ("compacto segno SVG", compact, lambda p: render_qr(p, "svg"), None),
+    ]
+
+    print("\n" + "=" * 76)
+    print(f"{'codificador':<32}{'mediana (ms)':>14}{'imagem (B)':>14}{'resposta (B)':>16}")
+    print("=" * 76)
+    baseline = None
+    for name, payload, encoder, wrap in cases:
+        median, image = timed(encoder, payload, args.iterations)
+        body = wrap(image) if wrap else image
+        if baseline is None:
+            baseline = (median, len(body))
+        print(f"{name:<32}{median:>14.2f}{len(image):>14,}{len(body):>16,}")
+    print("=" * 76)
+
+    png_body = len(render_qr(legacy, "png"))
+    print(f"🚀 PNG cru vs JSON base64 antigo: {1 - png_body / baseline[1]:.0%} menos bytes na resposta")
+
+
+if __name__ == "__main__":
+    main()
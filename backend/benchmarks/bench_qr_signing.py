@@ -0,0 +1,110 @@
+"""
+Benchmark: assinaturas de QR Code por segundo
+
+Compara o esquema legado (SHA-256 sobre string concatenada com a chave,
+e verify refazendo o sign completo) com o QRSigner (HMAC-SHA256 com
+estado pré-chaveado copiado a cada chamada), incluindo o HMAC ingênuo
+(hmac.new por chamada) e o verify em lote.
+
+Uso:
+    python benchmarks/bench_qr_signing.py [--count 200000]
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DEBUG", "false")
+
+from app.core.config import settings
+from app.core.qr_payload import QR_MAC_SIZE, QR_NONCE_SIZE, pack_qr_body
+from app.core.security import (
+    qr_signer, sign_qr_code_data, verify_qr_code_signature, verify_qr_code_signatures
+)
+
+
+def legacy_items(count: int):
+    valid_until = (datetime.utcnow() + timedelta(hours=24)).isoformat()
+    items = []
+    for _ in range(count):
+        data = {"visitor_id": str(uuid.uuid4()), "unit_id": str(uuid.uuid4()), "valid_until": valid_until}
+        nonce = secrets.token_urlsafe(16)
+        items.append((data, nonce, sign_qr_code_data(data, nonce)))
+    return items
+
+
+def compact_items(count: int):
+    valid_until = (datetime.utcnow() + timedelta(hours=24)).replace(microsecond=0)
+    items = []
+    for _ in range(count):
+        body = pack_qr_body(
+            uuid.uuid4(), uuid.uuid4(), valid_until, secrets.token_bytes(QR_NONCE_SIZE),
+            key_id=qr_signer.active_key_id
+        )
+        items.append((body, sign_qr_code_data(body)))
+    return items
+
+
+def naive_hmac_sign(body: bytes) -> str:
+    """HMAC sem estado pré-chaveado: re-deriva a chave a cada chamada"""
+    return hmac.new(settings.QR_SECRET_KEY.encode(), body, hashlib.sha256).digest()[:QR_MAC_SIZE].hex()
+
+
+def rate(label: str, count: int, func, repeat: int) -> float:
+    """Melhor de `repeat` rodadas (menos sensível a ruído da máquina)"""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    per_second = count / elapsed
+    print(f"{label:<40}{per_second:>16,.0f}")
+    return per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"📦 Gerando {args.count:,} payloads de cada formato...")
+    legacy = legacy_items(args.count)
+    compact = compact_items(args.count)
+
+    print("\n" + "=" * 56)
+    print(f"{'operação':<40}{'por segundo':>16}")
+    print("=" * 56)
+    legacy_sign = rate("legado sign (sha256 + concat)", args.count,
+                       lambda: [sign_qr_code_data(d, n) for d, n, _ in legacy], args.repeat)
+    legacy_verify = rate("legado verify", args.count,
+                         lambda: [verify_qr_code_signature(d, s, n) for d, n, s in legacy], args.repeat)
+    naive_sign = rate("HMAC ingênuo sign (hmac.new)", args.count,
+                      lambda: [naive_hmac_sign(b) for b, _ in compact], args.repeat)
+    signer_sign = rate("QRSigner sign", args.count,
+                       lambda: [sign_qr_code_data(b) for b, _ in compact], args.repeat)
+    signer_verify = rate("QRSigner verify", args.count,
+                         lambda: [verify_qr_code_signature(b, s) for b, s in compact], args.repeat)
+    batch_verify = rate("QRSigner verify em lote", args.count,
+                        lambda: verify_qr_code_signatures(compact), args.repeat)
+    print("=" * 56)
+
+    results = verify_qr_code_signatures(compact)
+    if not all(results):
+        print("❌ Alguma assinatura compacta não foi verificada")
+        sys.exit(1)
+    print(f"🚀 QRSigner vs legado: sign {signer_sign / legacy_sign:.1f}x | verify {signer_verify / legacy_verify:.1f}x "
+          f"| verify em lote {batch_verify / legacy_verify:.1f}x")
+    print(f"   QRSigner vs HMAC ingênuo: sign {signer_sign / naive_sign:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Benchmark: leituras e escritas concorrentes no SQLite com vários workers
+
+Sobe a API com `uvicorn --workers N` sobre um SQLite temporário, uma vez
+com os padrões do SQLite (SQLITE_PRAGMAS vazio: journal em modo DELETE,
+leitores bloqueados pelo escritor) e outra com o perfil de SQLITE_PRAGMAS
+(WAL, synchronous=NORMAL, busy_timeout, mmap, cache). Em cada rodada, C
+clientes misturam leituras (listas e estatísticas) e escritas (cadastro
+de visitantes e visitas) durante alguns segundos.
+
+Em seguida repete a mistura só no banco (N processos com sqlite3, sem
+HTTP), para separar a disputa por locks do custo de CPU da API: em
+máquinas com poucos núcleos a rodada HTTP fica limitada pela CPU.
+
+Uso:
+    python benchmarks/bench_sqlite_workers.py [--workers 4] [--clients 32] [--duration 10]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.config import settings
+from app.core.database import parse_sqlite_pragmas
+
+READS = ["/api/v1/visitas?limit=50", "/api/v1/visitantes?limit=50", "/api/v1/dashboard/stats"]
+
+
+def start_server(database: Path, pragmas: str, workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", SQLITE_PRAGMAS=pragmas, DEBUG="false")
+    # Schema migrado antes, para os workers não disputarem as migrações do startup
+    subprocess.run(
+        [sys.executable, "-m", "app.core.migrations"],
+        cwd=BACKEND_DIR, env=env, check=True
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--workers", str(workers),
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API não respondeu a tempo")
+
+
+async def seed(client: httpx.AsyncClient, database: Path) -> str:
+    """Dados de teste; retorna o id de uma unidade"""
+    (await client.post("/generate-test-data")).raise_for_status()
+    with sqlite3.connect(database) as con:
+        return con.execute("SELECT id FROM unidades LIMIT 1").fetchone()[0]
+
+
+async def write(client: httpx.AsyncClient, unidade_id: str) -> httpx.Response:
+    response = await client.post("/api/v1/visitantes", json={
+        "nome_completo": "Visitante Bench", "numero_documento": uuid.uuid4().hex[:11]
+    })
+    if response.status_code != 201:
+        return response
+    return await client.post("/api/v1/visitas", json={
+        "visitante_id": response.json()["id"], "unidade_id": unidade_id
+    })
+
+
+async def run_clients(client, unidade_id: str, clients: int, duration: float, write_ratio: float) -> dict:
+    stats = {"read": [], "write": [], "errors": 0, "locked": 0}
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            kind = "write" if random.random() < write_ratio else "read"
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    response = await write(client, unidade_id)
+                else:
+                    response = await client.get(random.choice(READS))
+            except httpx.HTTPError:
+                stats["errors"] += 1
+                continue
+            if response.status_code >= 400:
+                stats["errors"] += 1
+                if "locked" in response.text:
+                    stats["locked"] += 1
+                continue
+            stats[kind].append(time.perf_counter() - start)
+
+    await asyncio.gather(*[worker() for _ in range(clients)])
+    return stats
+
+
+async def run_profile(label: str, pragmas: str, args) -> dict:
+    database = Path(tempfile.mkdtemp(prefix="bench_sqlite_")) / "bench.db"
+    server = start_server(database, pragmas, args.workers, args.port)
+    try:
+        limits = httpx.Limits(max_connections=args.clients)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", timeout=30.0, limits=limits
+        ) as client:
+            await wait_ready(client)
+            unidade_id = await seed(client, database)
+            print(f"⏱️  {label}: {args.clients} clientes por {args.duration:.0f}s...")
+            stats = await run_clients(client, unidade_id, args.clients, args.duration, args.write_ratio)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    stats["label"] = label
+    return stats
+
+
+def raw_worker(database: str, pragmas: str, writer: bool, duration: float, queue) -> None:
+    con = sqlite3.connect(database)
+    for name, value in parse_sqlite_pragmas(pragmas):
+        con.execute(f"PRAGMA {name}={value}")
+    done = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            if writer:
+                con.execute("INSERT INTO bench (payload) VALUES (randomblob(200))")
+                con.commit()
+            else:
+                con.execute("SELECT count(*) FROM (SELECT * FROM bench ORDER BY id DESC LIMIT 50)").fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    queue.put(("write" if writer else "read", done, errors))
+
+
+def run_raw(pragmas: str, args) -> dict:
+    database = str(Path(tempfile.mkdtemp(prefix="bench_sqlite_raw_")) / "bench.db")
+    with sqlite3.connect(database) as con:
+        con.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, payload BLOB)")
+    queue = multiprocessing.Queue()
+    writers = max(1, round(args.workers * args.write_ratio))
+    processes = [
+        multiprocessing.Process(target=raw_worker, args=(database, pragmas, i < writers, args.duration, queue))
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = {"read": 0, "write": 0, "errors": 0}
+    for _ in processes:
+        kind, done, errors = queue.get()
+        totals[kind] += done
+        totals["errors"] += errors
+    for process in processes:
+        process.join()
+    return totals
+
+
+def p99(values):
+    return statistics.quantiles(values, n=100)[98] * 1000 if len(values) >= 2 else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por rodada")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="fração de escritas")
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(run_profile("padrão SQLite", "", args)),
+        asyncio.run(run_profile("SQLITE_PRAGMAS", settings.SQLITE_PRAGMAS, args)),
+    ]
+
+    print("\n" + "=" * 86)
+    print(f"{'perfil':<18}{'leituras/s':>12}{'escritas/s':>12}{'leit. p99 ms':>14}"
+          f"{'escr. p99 ms':>14}{'erros':>8}{'locked':>8}")
+    print("=" * 86)
+    for r in results:
+        print(f"{r['label']:<18}{len(r['read']) / args.duration:>12,.0f}{len(r['write']) / args.duration:>12,.0f}"
+              f"{p99(r['read']):>14.1f}{p99(r['write']):>14.1f}{r['errors']:>8}{r['locked']:>8}")
+    print("=" * 86)
+
+    default, tuned = results
+    total = lambda r: len(r["read"]) + len(r["write"])
+    print(f"🚀 API: vazão total {total(tuned) / max(total(default), 1):.1f}x | "
+          f"erros: {default['errors']} → {tuned['errors']}")
+
+    print(f"\n⏱️  Só o banco: {args.workers} processos por {args.duration:.0f}s em cada perfil...")
+    raw_default = run_raw("", args)
+    raw_tuned = run_raw(settings.SQLITE_PRAGMAS, args)
+    print("=" * 50)
+    print(f"{'perfil':<18}{'leituras/s':>12}{'escritas/s':>12}{'erros':>8}")
+    print("=" * 50)
+    for label, r in (("padrão SQLite", raw_default), ("SQLITE_PRAGMAS", raw_tuned)):
+        print(f"{label:<18}{r['read'] / args.duration:>12,.0f}{r['write'] / args.duration:>12,.0f}{r['errors']:>8}")
+    print("=" * 50)
+    raw_total = lambda r: r["read"] + r["write"]
+    print(f"🚀 Banco: vazão total {raw_total(raw_tuned) / max(raw_total(raw_default), 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
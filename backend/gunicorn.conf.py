@@ -0,0 +1,28 @@
+"""
+Gunicorn config for running several uvicorn workers
+    gunicorn main:app -c gunicorn.conf.py
+
+Metrics from all workers are aggregated through PROMETHEUS_MULTIPROC_DIR
+(see app.core.metrics): the directory is emptied when the master starts
+and a worker's live gauges are dropped when it exits.
+"""
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Set before the workers import the app (prometheus_client reads it at import time)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/portaria-metrics")
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,45 +1,48 @@
 """
 Script para inicializar o banco de dados
-Cria todas as tabelas e um usuário administrador padrão
+Aplica as migrações pendentes (Alembic) e cria o usuário administrador
+padrão se ele ainda não existir. Pode rodar a cada deploy: com o banco em
+dia custa uma consulta de versão e uma de existência do admin.
 """
 import sys
-from app.core.database import engine, Base, SessionLocal
+from app.core.database import engine, SessionLocal
+from app.core.migrations import migrate, head_revision
 from app.models.user import User
-from app.core.security import get_password_hash
+
+ADMIN_EMAIL = "admin@portaria.com"
+
 
 def init_database():
-    """Criar todas as tabelas"""
-    print("🔧 Criando tabelas no banco de dados...")
+    """Aplicar migrações pendentes"""
+    print("🔧 Verificando schema do banco de dados...")
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tabelas criadas com sucesso!")
+        previous = migrate(engine)
+        head = head_revision()
+        if previous == head:
+            print(f"✅ Schema já está na revisão {head}")
+        else:
+            print(f"✅ Schema migrado: {previous or 'vazio'} -> {head}")
         return True
     except Exception as e:
-        print(f"❌ Erro ao criar tabelas: {e}")
+        print(f"❌ Erro ao migrar banco: {e}")
         return False
 
 def create_admin_user():
-    """Criar usuário administrador padrão"""
-    print("\n👤 Criando usuário administrador...")
+    """Criar usuário administrador padrão (somente se não existir)"""
+    print("\n👤 Verificando usuário administrador...")
     
     db = SessionLocal()
     try:
-        # Verificar se admin já existe
-        existing_admin = db.query(User).filter(User.email == "admin@portaria.com").first()
-        if existing_admin:
-            print("⚠️  Usuário admin já existe! Recriando com senha correta...")
-            # Deletar o usuário existente para recriar
-            db.delete(existing_admin)
-            db.commit()
-        
-        # Criar novo admin com senha truncada
-        password = "admin123"
-        # Garantir que a senha está dentro do limite do bcrypt
-        if len(password.encode('utf-8')) > 72:
-            password = password[:72]
+        # Admin existente é mantido: nada de apagar e recalcular o bcrypt a cada deploy
+        if db.query(User.id).filter(User.email == ADMIN_EMAIL).first():
+            print("✅ Usuário admin já existe")
+            return True
+        
+        from app.core.security import get_password_hash
         
+        password = "admin123"
         admin = User(
-            email="admin@portaria.com",
+            email=ADMIN_EMAIL,
             password_hash=get_password_hash(password),
             nome="Administrador",
             role="admin"
@@ -49,7 +52,7 @@ def create_admin_user():
         db.commit()
         
         print("✅ Usuário administrador criado com sucesso!")
-        print("\n📧 E-mail: admin@portaria.com")
+        print(f"\n📧 E-mail: {ADMIN_EMAIL}")
         print("🔑 Senha: admin123")
         print("\n⚠️  IMPORTANTE: Altere a senha após o primeiro login!")
         
@@ -4,7 +4,7 @@ FastAPI Application
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import time
@@ -13,7 +13,19 @@ from datetime import datetime
 from pathlib import Path
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.blacklist import blacklist_index
+from app.core.database import engine, async_engine, AsyncSessionLocal, pool_stats, warm_pool, track_queries
+from app.core.hashing import hashing_executor, HashingQueueFull
+from app.core.migrations import ensure_schema
+from app.core.metrics import REQUESTS_IN_PROGRESS, observe_request, render_metrics
+from app.core.pagination import InvalidCursor
+from app.core.nonces import nonce_store, warm_nonce_store
+from app.core.principals import principal_cache
+from app.core.profiler import request_scope
+from app.core.refresh_tokens import revocation_store
+from app.core.security import token_cache
+from app.core.write_behind import write_behind
+from app.core.gate import gate_node
 from app.api.v1 import api_router
 
 # Configure logging
@@ -28,21 +40,58 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    started = time.perf_counter()
     logger.info("🚀 Iniciando Portaria Inteligente API...")
     logger.info(f"📦 Versão: {settings.APP_VERSION}")
     logger.info(f"🔧 Debug mode: {settings.DEBUG}")
     
-    # Create tables (em produção, usar Alembic)
+    # Schema version check: one query when already at head
     try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ Banco de dados conectado")
+        if ensure_schema(engine, settings.DB_AUTO_MIGRATE):
+            logger.info("✅ Banco de dados conectado")
     except Exception as e:
         logger.error(f"❌ Erro ao conectar banco: {e}")
     
+    # Open the pool's connections before the first request needs them
+    try:
+        warmed = await warm_pool()
+        logger.info(f"✅ {warmed} conexões abertas no pool")
+    except Exception as e:
+        logger.error(f"❌ Erro ao pré-aquecer o pool: {e}")
+    
+    # Warm consumed QR nonces so repeat scans skip the database
+    try:
+        async with AsyncSessionLocal() as db:
+            warmed = await warm_nonce_store(db)
+        logger.info(f"✅ {warmed} QR Codes já utilizados carregados no cache")
+    except Exception as e:
+        logger.error(f"❌ Erro ao carregar cache de QR Codes: {e}")
+    
+    # Blacklisted visitors in memory: "not blacklisted" answers skip the database
+    blacklisted = await blacklist_index.rebuild()
+    if blacklist_index.ready:
+        logger.info(f"✅ {blacklisted} visitantes bloqueados carregados")
+    blacklist_index.start()
+    
+    write_behind.start()
+    
+    if gate_node is not None:
+        await gate_node.start()
+        logger.info(f"🚪 Modo portaria ({settings.GATE_ID}): validação pela réplica local")
+    
+    logger.info(f"⏱️ Startup em {(time.perf_counter() - started) * 1000:.0f}ms")
     yield
     
     # Shutdown
     logger.info("👋 Encerrando aplicação...")
+    if gate_node is not None:
+        await gate_node.stop()
+    hashing_executor.shutdown()
+    await blacklist_index.stop()
+    await write_behind.stop()
+    await nonce_store.close()
+    await revocation_store.close()
+    await async_engine.dispose()
 
 
 # Initialize FastAPI
@@ -67,19 +116,42 @@ app.add_middleware(
 )
 
 
-# Request timing middleware
+# Request timing + metrics middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    start_time = time.perf_counter()
+    queries = track_queries(request.scope)
+    request_scope.set(request.scope)  # CPU attribution for the profiler
+    status_code = 500
+    REQUESTS_IN_PROGRESS.inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        REQUESTS_IN_PROGRESS.dec()
+        process_time = time.perf_counter() - start_time
+        if settings.METRICS_ENABLED:
+            observe_request(request, status_code, process_time, queries)
     response.headers["X-Process-Time"] = f"{process_time:.4f}s"
+    if settings.DEBUG:
+        response.headers["X-DB-Queries"] = str(queries.count)
+        response.headers["X-DB-Time"] = f"{queries.duration:.4f}s"
     return response
 
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+
+# Prometheus metrics (before the frontend catch-all route)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # Servir arquivos estáticos do frontend (React build)
 static_path = Path(__file__).parent / "static"
 if static_path.exists():
@@ -117,28 +189,39 @@ async def root():
 # Health check
 @app.get("/health")
 async def health_check():
-    return {
+    health = {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "database": "connected",
-        "version": settings.APP_VERSION
+        "database_pool": pool_stats(),
+        "version": settings.APP_VERSION,
+        "password_hashing": hashing_executor.stats(),
+        "qr_nonce_cache": nonce_store.stats(),
+        "auth_cache": {"tokens": token_cache.stats(), "principals": principal_cache.stats()},
+        "refresh_tokens": revocation_store.stats(),
+        "write_behind": write_behind.stats(),
+        "blacklist": blacklist_index.stats()
     }
+    if gate_node is not None:
+        health["gate"] = await gate_node.stats()
+    return health
 
 
 # Test data generator endpoint
 @app.post("/generate-test-data")
 async def generate_test_data():
     """Generate test data for development"""
-    from app.core.database import SessionLocal
+    from sqlalchemy import select
+    from app.core.database import AsyncSessionLocal
     from app.models.condominio import Condominio
     from app.models.unidade import Unidade
     from app.models.morador import Morador
     from uuid import uuid4
     
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     try:
         # Create or get test condominium
-        condominio = db.query(Condominio).first()
+        condominio = await db.scalar(select(Condominio).limit(1))
         if not condominio:
             condominio = Condominio(
                 id=uuid4(),
@@ -154,15 +237,15 @@ async def generate_test_data():
                 email="contato@teste.com"
             )
             db.add(condominio)
-            db.commit()
-            db.refresh(condominio)
+            await db.commit()
+            await db.refresh(condominio)
         
         # Create test units
         units_created = 0
         for bloco in ['A', 'B', 'C']:
             for numero in range(101, 106):
                 unidade_id = f"{bloco}{numero}"
-                exists = db.query(Unidade).filter(Unidade.numero == unidade_id).first()
+                exists = await db.scalar(select(Unidade).where(Unidade.numero == unidade_id))
                 if not exists:
                     unidade = Unidade(
                         id=uuid4(),
@@ -174,13 +257,13 @@ async def generate_test_data():
                     db.add(unidade)
                     units_created += 1
         
-        db.commit()
+        await db.commit()
         
         # Create test residents (without unit association)
         residents_created = 0
         for i in range(5):
             cpf = f"000000000{i:02d}"
-            exists = db.query(Morador).filter(Morador.cpf == cpf).first()
+            exists = await db.scalar(select(Morador).where(Morador.cpf == cpf))
             if not exists:
                 morador = Morador(
                     id=uuid4(),
@@ -194,7 +277,7 @@ async def generate_test_data():
                 db.add(morador)
                 residents_created += 1
         
-        db.commit()
+        await db.commit()
         
         return {
             "success": True,
@@ -206,7 +289,7 @@ async def generate_test_data():
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erro ao gerar dados de teste: {e}")
         return JSONResponse(
             status_code=500,
@@ -216,7 +299,23 @@ async def generate_test_data():
             }
         )
     finally:
-        db.close()
+        await db.close()
+
+
+# Password hashing pool saturated: shed load instead of queueing forever
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    logger.warning(f"Hashing queue saturated: {hashing_executor.stats()}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, tente novamente em instantes"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 
 # Global exception handler
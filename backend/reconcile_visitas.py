@@ -0,0 +1,64 @@
+"""
+Recalcula Visitante.total_visitas a partir das visitas com entrada
+Uma consulta agrupada (COUNT por visitante) e um UPDATE em lote só para os
+contadores divergentes. Entradas registradas durante a execução podem
+ficar de fora: rode fora do horário de pico ou repita depois.
+
+Uso:
+    python reconcile_visitas.py [--dry-run]
+"""
+import argparse
+import sys
+
+from sqlalchemy import bindparam, func, select, update
+
+from app.core.database import SessionLocal
+from app.models.visita import Visita
+from app.models.visitante import Visitante
+
+
+def reconcile(dry_run: bool = False) -> int:
+    """Corrige os contadores divergentes; retorna quantos estavam errados"""
+    db = SessionLocal()
+    try:
+        counts = dict(db.execute(
+            select(Visita.visitante_id, func.count())
+            .where(Visita.data_entrada.is_not(None))
+            .group_by(Visita.visitante_id)
+        ).all())
+        current = db.execute(select(Visitante.id, Visitante.total_visitas)).all()
+
+        drifted = [
+            {"b_id": visitante_id, "b_total": counts.get(visitante_id, 0)}
+            for visitante_id, total in current
+            if total != counts.get(visitante_id, 0)
+        ]
+        print(f"🔎 {len(current)} visitantes, {len(drifted)} contadores divergentes")
+        if drifted and not dry_run:
+            db.execute(
+                update(Visitante)
+                .where(Visitante.id == bindparam("b_id"))
+                .values(total_visitas=bindparam("b_total"))
+                .execution_options(synchronize_session=False, dml_strategy="core_only"),
+                drifted
+            )
+            db.commit()
+            print("✅ Contadores corrigidos")
+        return len(drifted)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="só conta os divergentes")
+    args = parser.parse_args()
+    try:
+        reconcile(args.dry_run)
+    except Exception as e:
+        print(f"❌ Erro ao reconciliar contadores: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()